@@ -1,3 +1,4 @@
+import asyncio
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
@@ -6,6 +7,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from apps.api.middlewares.metrics import MetricsMiddleware
 from apps.api.routers import chat, health, match, payments, reports, telegram, tips
+from apps.workers.counter_flusher import MessageCounterFlusher
 from core import close_redis
 from core.config import settings
 
@@ -14,8 +16,12 @@ from core.config import settings
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Application lifespan manager."""
     # Startup
+    counter_flusher = MessageCounterFlusher()
+    counter_flusher_task = asyncio.create_task(counter_flusher.run())
     yield
     # Shutdown
+    counter_flusher_task.cancel()
+    await counter_flusher.stop()
     await close_redis()
 
 
@@ -1,5 +1,6 @@
 """Chat endpoints for message relay and ending dialogs."""
 
+import logging
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException
@@ -8,6 +9,12 @@ from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from apps.api.deps import get_db
+from core.message_counters import apply_message_counts, record_message, restore_session_counts, take_session_counts
+from core.relay_routes import RelayRoute, fill_relay_route, get_relay_route, invalidate_relay_routes
+from core.reputation import ReputationDelta, record_reputation
+from core.user_loader import user_loader
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -26,20 +33,37 @@ class EndChatRequest(BaseModel):
     reason: str | None = None  # Optional reason for ending
 
 
+async def _count_message(chat_session_id: int, side: str) -> None:
+    """Count a relayed message; a counter failure must not fail the relay itself."""
+    try:
+        await record_message(chat_session_id, side)
+    except Exception as e:
+        logger.warning(f"Failed to count message of chat session {chat_session_id}: {e}")
+
+
 @router.post("/relay")
 async def relay_message(request: RelayMessageRequest, db: AsyncSession = Depends(get_db)) -> dict[str, int | str]:
     """
     Relay a message from one user to their active chat peer.
 
     Returns peer's telegram ID and nickname for bot to send message.
+    The route comes from the Redis relay cache; Postgres is only read on a miss.
     """
     from models.chat import ChatSession
     from models.match import Match
-    from models.user import User
+
+    try:
+        route = await get_relay_route(request.from_user)
+    except Exception as e:
+        logger.warning(f"Relay route lookup failed, reading the chat from the database: {e}")
+        route = None
+    if route:
+        # Increment msg_count_a / msg_count_b (buffered in Redis, flushed in batches)
+        await _count_message(route.chat_session_id, route.side)
+        return {"peer_tg_id": route.peer_tg_id, "peer_nickname": route.nickname, "status": "relayed"}
 
     # First, find the user by telegram ID to get internal user_id
-    user_result = await db.execute(select(User).where(User.tg_id == request.from_user))
-    sender = user_result.scalar_one_or_none()
+    sender = await user_loader(db).get_by_tg_id(request.from_user)
 
     if not sender:
         raise HTTPException(status_code=404, detail="User not found")
@@ -68,24 +92,29 @@ async def relay_message(request: RelayMessageRequest, db: AsyncSession = Depends
     # Determine peer user ID (using internal user_id, not tg_id)
     if match.user_a == sender.id:
         peer_user_id = match.user_b
-        # Increment msg_count_a
-        chat_session.msg_count_a += 1
+        side = "a"
     elif match.user_b == sender.id:
         peer_user_id = match.user_a
-        # Increment msg_count_b
-        chat_session.msg_count_b += 1
+        side = "b"
     else:
         raise HTTPException(status_code=403, detail="User not part of this match")
 
     # Get peer's telegram ID and nickname
-    peer_result = await db.execute(select(User).where(User.id == peer_user_id))
-    peer = peer_result.scalar_one_or_none()
+    peer = await user_loader(db).get(peer_user_id)
 
     if not peer:
         raise HTTPException(status_code=404, detail="Peer user not found")
 
-    # Commit message count increment
-    await db.commit()
+    # Increment msg_count_a / msg_count_b (buffered in Redis, flushed in batches)
+    await _count_message(chat_session.id, side)
+
+    try:
+        await fill_relay_route(
+            sender.tg_id,
+            RelayRoute(chat_session_id=chat_session.id, peer_tg_id=peer.tg_id, nickname=sender.nickname, side=side),
+        )
+    except Exception as e:
+        logger.warning(f"Failed to cache relay route of user {sender.tg_id}: {e}")
 
     return {
         "peer_tg_id": peer.tg_id,
@@ -104,11 +133,9 @@ async def end_chat(request: EndChatRequest, db: AsyncSession = Depends(get_db))
     """
     from models.chat import ChatSession
     from models.match import Match
-    from models.user import User
 
     # First, find the user by telegram ID to get internal user_id
-    user_result = await db.execute(select(User).where(User.tg_id == request.user_id))
-    ender = user_result.scalar_one_or_none()
+    ender = await user_loader(db).get_by_tg_id(request.user_id)
 
     if not ender:
         raise HTTPException(status_code=404, detail="User not found")
@@ -141,8 +168,7 @@ async def end_chat(request: EndChatRequest, db: AsyncSession = Depends(get_db))
         raise HTTPException(status_code=403, detail="User not part of this match")
 
     # Get peer's telegram ID
-    peer_result = await db.execute(select(User).where(User.id == peer_user_id))
-    peer = peer_result.scalar_one_or_none()
+    peer = await user_loader(db).get(peer_user_id)
 
     if not peer:
         raise HTTPException(status_code=404, detail="Peer user not found")
@@ -151,7 +177,26 @@ async def end_chat(request: EndChatRequest, db: AsyncSession = Depends(get_db))
     chat_session.ended_at = datetime.utcnow()
     match.status = "completed"
 
-    await db.commit()
+    # Force-flush buffered message counts so the ended session has exact values
+    counts = await take_session_counts([chat_session.id])
+    try:
+        await apply_message_counts(db, counts)
+        await db.commit()
+    except Exception:
+        await restore_session_counts(counts)
+        raise
+    await invalidate_relay_routes([ender.tg_id, peer.tg_id])
+
+    # rating_a is user_a's rating of user_b and vice versa
+    deltas = {match.user_a: ReputationDelta(sessions=1), match.user_b: ReputationDelta(sessions=1)}
+    for rated_user, rating in ((match.user_b, chat_session.rating_a), (match.user_a, chat_session.rating_b)):
+        if rating is not None:
+            deltas[rated_user].rating_sum += rating
+            deltas[rated_user].rating_count += 1
+    try:
+        await record_reputation(db, deltas)
+    except Exception as e:
+        logger.warning(f"Failed to update reputation for match {match.id}: {e}")
 
     return {
         "peer_tg_id": peer.tg_id,
@@ -1,6 +1,6 @@
 """Match endpoints."""
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -32,11 +32,14 @@ async def find_match(request: MatchFindRequest, db: AsyncSession = Depends(get_d
         f"DEBUG: Received match request: user_id={request.user_id}, topics={request.topics}, timezone={request.timezone}"
     )
 
+    import time
     from datetime import datetime
 
     from sqlalchemy import select
 
     from apps.api.deps import get_redis_client
+    from core.config import settings
+    from core.match_payload import encode_match_request
     from models.user import User
 
     # Validate user exists and has profile with ≥2 topics
@@ -53,12 +56,11 @@ async def find_match(request: MatchFindRequest, db: AsyncSession = Depends(get_d
         return {"status": "error", "message": "Safety acknowledgement required"}
 
     # Check user has ≥2 topics
-    from sqlalchemy import func
-
     from models.topic import UserTopic
 
-    topic_count_result = await db.execute(select(func.count(UserTopic.topic_id)).where(UserTopic.user_id == user.id))
-    topic_count = topic_count_result.scalar()
+    topic_result = await db.execute(select(UserTopic.topic_id, UserTopic.weight).where(UserTopic.user_id == user.id))
+    topic_weights = dict(topic_result.all())
+    topic_count = len(topic_weights)
     print(f"DEBUG: User has {topic_count} topics")
 
     if topic_count < 2:
@@ -69,18 +71,46 @@ async def find_match(request: MatchFindRequest, db: AsyncSession = Depends(get_d
     redis_client = await get_redis_client()
     print("DEBUG: Got Redis client")
 
-    payload = {
-        "user_id": str(user.id),
-        "tg_id": str(request.user_id),
-        "topics": ",".join(request.topics),
-        "timezone": request.timezone,
-        "requested_at": datetime.utcnow().isoformat(),
-    }
+    if settings.match_payload_version >= 2:
+        # Packed entry with topic IDs - the worker decodes it without any lookups
+        payload = encode_match_request(user.id, request.user_id, topic_weights, request.timezone, time.time())
+    else:
+        payload = {
+            "user_id": str(user.id),
+            "tg_id": str(request.user_id),
+            "topics": ",".join(request.topics),
+            "timezone": request.timezone,
+            "requested_at": datetime.utcnow().isoformat(),
+        }
     print(f"DEBUG: Payload for Redis: {payload}")
 
-    # XADD to match.find stream
-    stream_id = await redis_client.xadd("match.find", payload)
-    print(f"DEBUG: Added to Redis stream with ID: {stream_id}")
+    # Coalesce repeated /find taps: at most one queued search per user
+    from core.waiting_pool import begin_search, cancel_search, record_search_entry
+
+    queued_id = await begin_search(user.id)
+    if queued_id is not None:
+        print(f"DEBUG: Search already in flight for user {user.id} ({queued_id})")
+        return {
+            "status": "queued",
+            "user_id": str(request.user_id),
+            "stream_id": queued_id,
+            "message": "Already searching...",
+        }
+
+    # Mark user as live searcher, then XADD to the match.find shard of their primary topic
+    from core.match_streams import stream_for_topics
+    from core.waiting_pool import add_to_waiting_pool
+
+    stream_name = stream_for_topics(topic_weights)
+    try:
+        await add_to_waiting_pool(user.id, topic_weights)
+        stream_id = await redis_client.xadd(stream_name, payload)
+        await record_search_entry(user.id, stream_id)
+    except Exception:
+        # Don't leave the reservation behind, or /find answers "Already searching" until it expires
+        await cancel_search(user.id)
+        raise
+    print(f"DEBUG: Added to Redis stream {stream_name} with ID: {stream_id}")
 
     return {
         "status": "queued",
@@ -90,64 +120,88 @@ async def find_match(request: MatchFindRequest, db: AsyncSession = Depends(get_d
     }
 
 
-@router.post("/confirm")
-async def confirm_match(request: MatchConfirmRequest, db: AsyncSession = Depends(get_db)) -> dict[str, str]:
-    """Confirm or decline a match."""
-    from datetime import datetime, timedelta
+async def _notify_match_active(user_a: int, user_b: int) -> None:
+    """Send the chat intro to both users (after the response; rate-limited sends may wait)."""
+    from apps.workers.notifier import notifier
+    from core.db import AsyncSessionLocal
+
+    # The request's session is closed by the time background tasks run
+    async with AsyncSessionLocal() as db:
+        await notifier.send_match_active(db, user_a, user_b)
+        await notifier.send_match_active(db, user_b, user_a)
 
-    from sqlalchemy import and_, or_, select
 
+async def _notify_match_declined(user_id: int) -> None:
+    """Tell the other user their proposal was declined (after the response)."""
     from apps.workers.notifier import notifier
-    from models.chat import ChatSession
-    from models.match import Match
-    from models.recent_contact import RecentContact
-    from models.user import User
+    from core.db import AsyncSessionLocal
 
-    # Get match
-    result = await db.execute(select(Match).where(Match.id == request.match_id))
-    match = result.scalar_one_or_none()
+    async with AsyncSessionLocal() as db:
+        await notifier.send_match_declined(db, user_id)
 
-    if not match:
-        return {"status": "error", "message": "Match not found"}
 
-    # SECURITY: Check match is in proposed state (prevent re-processing)
-    if match.status != "proposed":
-        return {"status": "error", "message": f"Match not in proposed state (current: {match.status})"}
+@router.post("/confirm")
+async def confirm_match(
+    request: MatchConfirmRequest, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)
+) -> dict[str, str]:
+    """
+    Confirm or decline a match.
+
+    The answer and the resulting status are applied by a single UPDATE (see
+    core.match_confirm), so simultaneous accepts from both users activate the
+    match exactly once.
+    """
+    from datetime import datetime, timedelta
 
-    # Check if expired
-    if match.expires_at and match.expires_at < datetime.utcnow():
-        match.status = "expired"
-        await db.commit()
-        return {"status": "expired", "message": "Match offer expired"}
+    from sqlalchemy import select, update
+
+    from core.match_confirm import apply_confirmation, start_chat_session
+    from core.message_counters import apply_message_counts, restore_session_counts, take_session_counts
+    from core.relay_routes import RelayRoute, invalidate_relay_routes, set_relay_routes
+    from core.user_loader import user_loader
+    from core.waiting_pool import requeue_unmatched
+    from models.match import Match
+    from models.recent_contact import RecentContact
 
     # Parse action
     accepted = request.action == "accept"
 
-    # Get user
-    user_result = await db.execute(select(User).where(User.id == request.user_id))
-    user = user_result.scalar_one_or_none()
-
-    if not user:
-        return {"status": "error", "message": "User not found"}
+    confirmation = await apply_confirmation(db, request.match_id, request.user_id, accepted)
+    if confirmation is None:
+        # Nothing updated: find out why (cold path)
+        result = await db.execute(
+            select(Match.status, Match.expires_at, Match.user_a, Match.user_b).where(Match.id == request.match_id)
+        )
+        row = result.first()
+        if not row:
+            return {"status": "error", "message": "Match not found"}
+        status, expires_at, user_a, user_b = row
+
+        # SECURITY: Check match is in proposed state (prevent re-processing)
+        if status != "proposed":
+            return {"status": "error", "message": f"Match not in proposed state (current: {status})"}
+
+        # Check if expired
+        if expires_at and expires_at < datetime.utcnow():
+            await db.execute(
+                update(Match)
+                .where(Match.id == request.match_id, Match.status == "proposed")
+                .values(status="expired")
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            # Like the expiry sweeper: both users resume searching
+            await requeue_unmatched(db, [user_a, user_b])
+            return {"status": "expired", "message": "Match offer expired"}
 
-    # SECURITY: Validate user is part of this match
-    if user.id not in (match.user_a, match.user_b):
+        # SECURITY: Validate user is part of this match
         return {"status": "error", "message": "User not part of this match"}
 
-    # Update acceptance status
-    if user.id == match.user_a:
-        match.user_a_accepted = accepted
-        other_user_id = match.user_b
-    elif user.id == match.user_b:
-        match.user_b_accepted = accepted
-        other_user_id = match.user_a
-    else:
-        # This should never happen due to check above, but keep for safety
-        return {"status": "error", "message": "User not part of this match"}
+    user_a, user_b = confirmation.user_a, confirmation.user_b
+    other_user_id = user_b if request.user_id == user_a else user_a
 
-    # If declined, set status and add to recent_contacts
-    if not accepted:
-        match.status = "declined"
+    # If declined, add to recent_contacts
+    if confirmation.status == "declined":
         # Add to recent_contacts with 72h TTL (bidirectional to prevent reverse matches)
         # Use UPSERT to prevent IntegrityError on re-match after cooldown
         until = datetime.utcnow() + timedelta(hours=72)
@@ -159,8 +213,8 @@ async def confirm_match(request: MatchConfirmRequest, db: AsyncSession = Depends
             insert(RecentContact)
             .values(
                 [
-                    {"user_id": user.id, "other_id": other_user_id, "until": until},
-                    {"user_id": other_user_id, "other_id": user.id, "until": until},
+                    {"user_id": request.user_id, "other_id": other_user_id, "until": until},
+                    {"user_id": other_user_id, "other_id": request.user_id, "until": until},
                 ]
             )
             .on_conflict_do_update(index_elements=["user_id", "other_id"], set_={"until": until})
@@ -168,78 +222,62 @@ async def confirm_match(request: MatchConfirmRequest, db: AsyncSession = Depends
         await db.execute(stmt)
         await db.commit()
 
-        # Notify other user
-        await notifier.send_match_declined(db, other_user_id)
+        # Drop cached exclusion lists in match workers
+        from core.recent_contacts import publish_recent_contacts_changed
 
-        return {"status": "declined", "match_id": str(request.match_id)}
+        await publish_recent_contacts_changed([request.user_id, other_user_id])
 
-    # Check if both accepted
-    if match.user_a_accepted and match.user_b_accepted:
-        # CLOSE ALL OTHER ACTIVE CHATS FOR BOTH USERS
-        # This prevents multiple active chats issue
-
-        # Close all other active sessions for both users
-        close_sessions_result = await db.execute(
-            select(ChatSession)
-            .join(Match, ChatSession.match_id == Match.id)
-            .where(
-                and_(
-                    ChatSession.ended_at.is_(None),
-                    Match.status == "active",
-                    or_(Match.user_a.in_([match.user_a, match.user_b]), Match.user_b.in_([match.user_a, match.user_b])),
-                    Match.id != match.id,
-                )
-            )
-        )
-
-        old_sessions = close_sessions_result.scalars().all()
-        for old_session in old_sessions:
-            old_session.ended_at = datetime.utcnow()
-
-        # Also close the matches themselves
-        close_matches_result = await db.execute(
-            select(Match).where(
-                and_(
-                    Match.status == "active",
-                    or_(Match.user_a.in_([match.user_a, match.user_b]), Match.user_b.in_([match.user_a, match.user_b])),
-                    Match.id != match.id,
-                )
-            )
-        )
-
-        old_matches = close_matches_result.scalars().all()
-        for old_match in old_matches:
-            old_match.status = "completed"
+        # The other user is told the search continues: put them back into the waiting pool
+        await requeue_unmatched(db, [other_user_id])
 
-        match.status = "active"
+        # Notify other user; sends may wait for a rate-limit slot, so not on the request path
+        background_tasks.add_task(_notify_match_declined, other_user_id)
 
-        # Create chat session
-        chat_session = ChatSession(match_id=match.id)
-        db.add(chat_session)
+        return {"status": "declined", "match_id": str(request.match_id)}
 
-        await db.commit()
-        await db.refresh(chat_session)  # Get chat_session.id
+    # Both accepted: close other active chats of both users and open the chat session
+    if confirmation.status == "active":
+        chat_session_id, closed_partners, ended_sessions = await start_chat_session(
+            db, request.match_id, user_a, user_b
+        )
 
-        # Get Telegram IDs for both users
-        user_a_result = await db.execute(select(User).where(User.id == match.user_a))
-        user_b_result = await db.execute(select(User).where(User.id == match.user_b))
-        user_a_obj = user_a_result.scalar_one()
-        user_b_obj = user_b_result.scalar_one()
+        # Force-flush buffered message counts of the closed chats; put them back if the commit fails
+        counts = await take_session_counts(ended_sessions)
+        try:
+            await apply_message_counts(db, counts)
+            await db.commit()
+        except Exception:
+            await restore_session_counts(counts)
+            raise
+
+        # Get Telegram IDs for both users and former partners (one query)
+        users = await user_loader(db).load_many([user_a, user_b, *closed_partners])
+        user_a_obj = users[user_a]
+        user_b_obj = users[user_b]
+
+        # Route relayed messages of both users to each other; former partners' chats are closed
+        await invalidate_relay_routes([users[user_id].tg_id for user_id in closed_partners if user_id in users])
+        await set_relay_routes(
+            {
+                user_a_obj.tg_id: RelayRoute(chat_session_id, user_b_obj.tg_id, user_a_obj.nickname, "a"),
+                user_b_obj.tg_id: RelayRoute(chat_session_id, user_a_obj.tg_id, user_b_obj.nickname, "b"),
+            }
+        )
 
         # Store active session in Redis for /report and /block handlers
         from apps.bot.redis import set_active_session
 
-        await set_active_session(user_a_obj.tg_id, chat_session.id, user_b_obj.tg_id)
-        await set_active_session(user_b_obj.tg_id, chat_session.id, user_a_obj.tg_id)
+        await set_active_session(user_a_obj.tg_id, chat_session_id, user_b_obj.tg_id)
+        await set_active_session(user_b_obj.tg_id, chat_session_id, user_a_obj.tg_id)
 
-        # Send intro message to both users
-        await notifier.send_match_active(db, match.user_a, match.user_b)
-        await notifier.send_match_active(db, match.user_b, match.user_a)
+        # Send intro message to both users once the response is out (BULK sends may wait up to
+        # telegram_rate_max_wait_s each, longer than the bot's API timeout)
+        background_tasks.add_task(_notify_match_active, user_a, user_b)
 
         return {
             "status": "active",
             "match_id": str(request.match_id),
-            "chat_session_id": str(chat_session.id),
+            "chat_session_id": str(chat_session_id),
             "message": "Match confirmed! Chat session started.",
         }
 
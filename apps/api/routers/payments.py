@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from apps.api.deps import get_db
 from core.metrics import tips_errors_total
+from core.reputation import ReputationDelta, record_reputation
 from core.security import verify_tips_payload
 
 router = APIRouter()
@@ -139,7 +140,7 @@ async def record_payment(request: RecordPaymentRequest, db: AsyncSession = Depen
         JOIN users ub ON ub.tg_id = :to_tg
         WHERE m.id = :match_id
         ON CONFLICT (telegram_payment_id) DO NOTHING
-        RETURNING id
+        RETURNING id, to_user
     """
     )
 
@@ -164,6 +165,10 @@ async def record_payment(request: RecordPaymentRequest, db: AsyncSession = Depen
         logger.info(
             f"Payment recorded: tip_id={inserted[0]}, amount={amount_int} XTR, from={from_tg_int}, to={to_tg_int}"
         )
+        try:
+            await record_reputation(db, {inserted[1]: ReputationDelta(tips_received=1)})
+        except Exception as e:
+            logger.warning(f"Failed to update reputation for tip {inserted[0]}: {e}")
     else:
         logger.info(f"Duplicate payment ignored: tpid={sp.telegram_payment_charge_id}")
 
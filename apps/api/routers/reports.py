@@ -10,8 +10,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from apps.api.deps import get_db
 from core.auth import bot_auth
+from core.message_counters import apply_message_counts, restore_session_counts, take_session_counts
 from core.metrics import blocks_latency_seconds, blocks_total, reports_latency_seconds, reports_total
+from core.recent_contacts import publish_recent_contacts_changed
 from core.redis import get_redis
+from core.relay_routes import invalidate_relay_routes
+from core.reputation import ReputationDelta, record_reputation
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 logger = logging.getLogger(__name__)
@@ -110,10 +114,11 @@ async def create_report(
             INSERT INTO reports(chat_session_id, from_user, to_user, reason, comment)
             VALUES (:sid, :from_id, :to_id, :reason, :comment)
             ON CONFLICT ON CONSTRAINT uq_reports_once_per_session DO NOTHING
+            RETURNING id
         """
         )
 
-        await db.execute(
+        inserted = await db.execute(
             insert_query,
             {
                 "sid": body.chat_session_id,
@@ -125,6 +130,13 @@ async def create_report(
         )
         await db.commit()
 
+        # Duplicate reports (same session) don't count twice
+        if inserted.first():
+            try:
+                await record_reputation(db, {row["to_id"]: ReputationDelta(reports_received=1)})
+            except Exception as e:
+                logger.warning(f"Failed to update reputation for user {row['to_id']}: {e}")
+
         # Metrics
         reports_total.labels(reason=body.reason).inc()
 
@@ -214,7 +226,19 @@ async def block_peer(
         )
 
         await db.execute(cooldown_query, {"caller": caller_tg, "peer": body.peer_tg})
-        await db.commit()
+
+        # Force-flush buffered message counts of the ended session; put them back if the commit fails
+        counts = await take_session_counts([row["chat_id"]])
+        try:
+            await apply_message_counts(db, counts)
+            await db.commit()
+        except Exception:
+            await restore_session_counts(counts)
+            raise
+        await invalidate_relay_routes([row["tg_a"], row["tg_b"]])
+
+        # Drop cached exclusion lists in match workers
+        await publish_recent_contacts_changed([row["user_a"], row["user_b"]])
 
         # Metrics
         blocks_total.inc()
@@ -8,6 +8,7 @@ from aiohttp import web
 from apps.bot.handlers import block, chat, end, find, profile, report, sos, start, tips
 from apps.bot.middlewares.database import DatabaseMiddleware
 from apps.bot.middlewares.rate_limit import RateLimitMiddleware
+from apps.bot.outbound import outbound
 from core.config import settings
 
 # Initialize bot and dispatcher
@@ -43,6 +44,7 @@ async def on_startup(app: web.Application) -> None:
 async def on_shutdown(app: web.Application) -> None:
     """Clean up on shutdown."""
     await bot.delete_webhook()
+    await outbound.drain(timeout=10)
     await bot.session.close()
 
 
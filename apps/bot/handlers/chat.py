@@ -1,15 +1,44 @@
 """Chat message relay handler."""
 
+import asyncio
 import logging
 
 from aiogram import F, Router
 from aiogram.types import Message
 
 from apps.bot.api_client import api_client
+from apps.bot.outbound import outbound
+from core.config import settings
+from core.message_counters import record_message
+from core.relay_routes import get_relay_route
 
 router = Router()
 logger = logging.getLogger(__name__)
 
+# Counter increments in flight (referenced so they are not garbage-collected)
+_pending_counts: set[asyncio.Task] = set()
+
+
+def _count_in_background(chat_session_id: int, side: str) -> None:
+    """Record the message count without delaying the relay."""
+    task = asyncio.create_task(record_message(chat_session_id, side))
+    _pending_counts.add(task)
+    task.add_done_callback(_on_counted)
+
+
+def _on_counted(task: asyncio.Task) -> None:
+    _pending_counts.discard(task)
+    if not task.cancelled() and task.exception():
+        logger.error(f"Failed to count relayed message: {task.exception()}")
+
+
+async def _enqueue(message: Message, peer_tg_id: int, sender_nickname: str) -> bool:
+    """Queue the message for the peer; tell the sender if the peer's queue is full."""
+    if outbound.enqueue(peer_tg_id, f"✉️ {sender_nickname}: {message.text}", seq=message.message_id):
+        return True
+    await message.answer("⏳ Собеседник ещё не получил предыдущие сообщения. Попробуйте чуть позже.")
+    return False
+
 
 @router.message(F.text & ~F.text.startswith("/"))
 async def handle_text_message(message: Message) -> None:
@@ -18,12 +47,29 @@ async def handle_text_message(message: Message) -> None:
 
     This is a catch-all handler for text messages (not commands).
     It must be registered LAST in bot.py to avoid intercepting commands.
+
+    Fast path: the peer comes from the Redis relay route cache and the
+    message is sent directly; the API is only called on a cache miss.
+    Sends go through the per-chat outbound queue, which keeps them in order.
     """
     if not message.text or not message.from_user:
         return
 
+    route = None
+    if settings.bot_relay_fast_path:
+        try:
+            route = await get_relay_route(message.from_user.id)
+        except Exception as e:
+            # Route cache unavailable: the API can still relay from Postgres
+            logger.warning(f"Relay route lookup failed, falling back to the API: {e}")
+
     try:
-        # Call API to relay message
+        if route:
+            if await _enqueue(message, route.peer_tg_id, route.nickname):
+                _count_in_background(route.chat_session_id, route.side)
+            return
+
+        # Cache miss: call API to relay message
         response = await api_client.post(
             "/chat/relay", json_data={"from_user": message.from_user.id, "text": message.text}
         )
@@ -32,11 +78,8 @@ async def handle_text_message(message: Message) -> None:
         sender_nickname = response.get("peer_nickname", "Собеседник")  # Use nickname from API
 
         if peer_tg_id:
-            # Lazy import to avoid circular dependency
-            from apps.bot.bot import bot
-
             # Send message to peer with sender's nickname
-            await bot.send_message(chat_id=peer_tg_id, text=f"✉️ {sender_nickname}: {message.text}")
+            await _enqueue(message, peer_tg_id, sender_nickname)
 
             # Optional: send confirmation to sender
             # await message.answer("✅ Отправлено")
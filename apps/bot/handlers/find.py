@@ -7,8 +7,8 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from apps.bot.api_client import api_client
+from core.topic_catalog import topic_catalog
 from models import User, UserTopic
-from models.topic import Topic
 
 router = Router()
 
@@ -25,8 +25,9 @@ async def cmd_find(message: Message, db: AsyncSession) -> None:
         return
 
     # Check if user has at least 2 topics
-    result = await db.execute(select(UserTopic).where(UserTopic.user_id == user.id))
-    topics_count = len(result.scalars().all())
+    result = await db.execute(select(UserTopic.topic_id).where(UserTopic.user_id == user.id))
+    topic_ids = result.scalars().all()
+    topics_count = len(topic_ids)
 
     if topics_count < 2:
         await message.answer("❌ Добавьте минимум 2 темы в профиле\n\nИспользуйте команду /profile для настройки")
@@ -37,9 +38,8 @@ async def cmd_find(message: Message, db: AsyncSession) -> None:
         await message.answer("❌ Подтвердите правила безопасности в профиле: /profile")
         return
 
-    # Get user's topics for the API request
-    topics_result = await db.execute(select(Topic.slug).join(UserTopic).where(UserTopic.user_id == user.id))
-    user_topics = topics_result.scalars().all()
+    # Get user's topic slugs for the API request from the in-memory catalog
+    user_topics = await topic_catalog.slugs_for(topic_ids)
 
     # Add user to match queue via API
     try:
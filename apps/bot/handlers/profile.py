@@ -9,7 +9,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from apps.bot.keyboards.inline import get_timezones_keyboard, get_topics_keyboard
 from apps.bot.states.profile import ProfileForm
-from models import Topic, User, UserTopic
+from core.topic_catalog import topic_catalog
+from core.user_topics import publish_user_topics_changed
+from models import User, UserTopic
 
 router = Router()
 
@@ -35,9 +37,9 @@ async def cmd_profile(message: Message, state: FSMContext, db: AsyncSession) ->
 async def show_profile(message: Message, user: User, db: AsyncSession) -> None:
     """Display user profile."""
     # Load user topics
-    result = await db.execute(select(Topic).join(UserTopic).where(UserTopic.user_id == user.id))
-    topics = result.scalars().all()
-    topics_text = ", ".join(t.title for t in topics) if topics else "не указаны"
+    result = await db.execute(select(UserTopic.topic_id).where(UserTopic.user_id == user.id))
+    titles = await topic_catalog.titles_for(result.scalars().all())
+    topics_text = ", ".join(titles) if titles else "не указаны"
 
     profile_text = f"""
 📋 Ваш профиль:
@@ -70,8 +72,8 @@ async def cmd_edit_topics(message: Message, state: FSMContext, db: AsyncSession)
         await message.answer("Сначала создайте профиль командой /profile.")
         return
 
-    topics_result = await db.execute(select(Topic.slug).join(UserTopic).where(UserTopic.user_id == user.id))
-    selected_topics = set(topics_result.scalars().all())
+    topics_result = await db.execute(select(UserTopic.topic_id).where(UserTopic.user_id == user.id))
+    selected_topics = set(await topic_catalog.slugs_for(topics_result.scalars().all()))
     print(f"DEBUG: Selected topics: {selected_topics}")
 
     await state.clear()
@@ -199,16 +201,16 @@ async def process_topics_done_edit(callback: CallbackQuery, state: FSMContext, d
 
     if selected_topics:
         print(f"DEBUG: Adding new topics: {selected_topics}")
-        topics_result = await db.execute(select(Topic).where(Topic.slug.in_(selected_topics)))
-        topics = topics_result.scalars().all()
-        print(f"DEBUG: Found {len(topics)} topics in database")
-        for topic in topics:
-            print(f"DEBUG: Adding topic {topic.slug} (ID: {topic.id}) for user {user_id}")
-            db.add(UserTopic(user_id=user_id, topic_id=topic.id, weight=1))
+        topic_ids = await topic_catalog.ids_for(selected_topics)
+        print(f"DEBUG: Found {len(topic_ids)} topics in catalog")
+        for slug, topic_id in topic_ids.items():
+            print(f"DEBUG: Adding topic {slug} (ID: {topic_id}) for user {user_id}")
+            db.add(UserTopic(user_id=user_id, topic_id=topic_id, weight=1))
 
     print("DEBUG: Committing changes to database")
     await db.commit()
     print("DEBUG: Changes committed successfully")
+    await publish_user_topics_changed(user_id)
 
     user_result = await db.execute(select(User).where(User.id == user_id))
     user = user_result.scalar_one()
@@ -289,17 +291,17 @@ async def process_safety_confirmation(callback: CallbackQuery, state: FSMContext
     db.add(user)
     await db.flush()
 
-    # Load topics from DB
+    # Resolve topics from the catalog
     selected_topics = data.get("selected_topics", set())
-    result = await db.execute(select(Topic).where(Topic.slug.in_(selected_topics)))
-    topics = result.scalars().all()
+    topic_ids = await topic_catalog.ids_for(selected_topics)
 
     # Create user-topic relationships
-    for topic in topics:
-        user_topic = UserTopic(user_id=user.id, topic_id=topic.id, weight=1)
+    for topic_id in topic_ids.values():
+        user_topic = UserTopic(user_id=user.id, topic_id=topic_id, weight=1)
         db.add(user_topic)
 
     await db.commit()
+    await publish_user_topics_changed(user.id)
 
     await callback.message.edit_text(
         f"✅ Профиль создан, {user.nickname}!\n\nТеперь вы можете найти собеседника командой /find"
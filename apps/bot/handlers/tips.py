@@ -9,6 +9,7 @@ from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMar
 
 from apps.bot.api_client import api_client
 from core.metrics import tips_errors_total, tips_paid_total, tips_processing_duration
+from core.rate_governor import Priority, rate_governor
 from core.redis import get_redis
 from core.security import sign_tips_payload
 
@@ -145,6 +146,8 @@ async def on_tip_callback(callback: CallbackQuery) -> None:
 
     # Send Telegram Stars invoice
     try:
+        if not await rate_governor.acquire(callback.from_user.id, Priority.NORMAL):
+            raise RuntimeError("Telegram rate budget exhausted")
         await callback.message.bot.send_invoice(
             chat_id=callback.from_user.id,
             title="Чаевые собеседнику",
@@ -296,6 +299,8 @@ async def on_successful_payment(message: Message) -> None:
             # Send notification to recipient
             if to_tg and to_tg != from_tg:
                 try:
+                    if not await rate_governor.acquire(to_tg, Priority.NORMAL):
+                        raise RuntimeError("Telegram rate budget exhausted")
                     await message.bot.send_message(
                         chat_id=to_tg,
                         text=f"💙 Вы получили чаевые!\n\n"
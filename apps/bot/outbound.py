@@ -0,0 +1,120 @@
+"""Ordered outbound delivery of relayed chat messages."""
+
+import asyncio
+import heapq
+import logging
+from dataclasses import dataclass, field
+
+from aiogram.exceptions import TelegramAPIError, TelegramNetworkError, TelegramRetryAfter, TelegramServerError
+
+from core.config import settings
+from core.rate_governor import Priority, rate_governor
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(order=True)
+class OutgoingMessage:
+    """Message waiting in a chat's queue, ordered by the source message ID."""
+
+    seq: int
+    text: str = field(compare=False)
+
+
+class OutboundQueue:
+    """
+    Per-chat FIFO send queues with a bounded pool of concurrent sends.
+
+    Every destination chat has its own queue drained by at most one task, so
+    messages to one peer go out strictly one after another while different
+    peers are served in parallel (up to bot_outbound_concurrency sends).
+    Queues are ordered by the sender's message_id, which puts back in order
+    updates whose handlers ran out of order. Flood control (429) waits the
+    `retry_after` Telegram asks for; network and server errors retry with
+    exponential backoff. Either way, only the affected chat is held back.
+    Every send first takes a USER-priority token from the rate governor.
+    """
+
+    def __init__(self) -> None:
+        self.queues: dict[int, list[OutgoingMessage]] = {}  # chat_id -> heap
+        self.workers: dict[int, asyncio.Task] = {}  # chat_id -> draining task
+        self.slots = asyncio.Semaphore(settings.bot_outbound_concurrency)
+
+    def enqueue(self, chat_id: int, text: str, seq: int) -> bool:
+        """
+        Queue a message for a chat.
+
+        Args:
+            chat_id: Destination Telegram chat ID
+            text: Message text
+            seq: Ordering key, the sender's message_id
+
+        Returns:
+            False if the chat's queue is full and the message was dropped
+        """
+        queue = self.queues.setdefault(chat_id, [])
+        if len(queue) >= settings.bot_outbound_max_per_chat:
+            logger.warning(f"[OUTBOUND] Queue for chat {chat_id} is full, dropping message")
+            return False
+        heapq.heappush(queue, OutgoingMessage(seq, text))
+        if chat_id not in self.workers:
+            self.workers[chat_id] = asyncio.create_task(self._drain_chat(chat_id))
+        return True
+
+    @property
+    def pending(self) -> int:
+        """Messages queued across all chats."""
+        return sum(len(queue) for queue in self.queues.values())
+
+    async def drain(self, timeout: float) -> None:
+        """Wait up to timeout seconds for queued messages to be sent, then cancel the rest."""
+        workers = list(self.workers.values())
+        if not workers:
+            return
+        _, unfinished = await asyncio.wait(workers, timeout=timeout)
+        for task in unfinished:
+            task.cancel()
+        if unfinished:
+            logger.warning(f"[OUTBOUND] Dropped {self.pending} unsent message(s) on shutdown")
+
+    async def _drain_chat(self, chat_id: int) -> None:
+        queue = self.queues[chat_id]
+        try:
+            while queue:
+                await self._deliver(chat_id, heapq.heappop(queue))
+        finally:
+            del self.workers[chat_id]
+            if not queue:
+                del self.queues[chat_id]
+
+    async def _deliver(self, chat_id: int, message: OutgoingMessage) -> bool:
+        """Send one message, retrying transient failures."""
+        # Lazy import to avoid circular dependency
+        from apps.bot.bot import bot
+
+        for attempt in range(1, settings.bot_outbound_max_attempts + 1):
+            # Shared Telegram budget, waited for outside the concurrency slots
+            if not await rate_governor.acquire(chat_id, Priority.USER):
+                logger.error(f"[OUTBOUND] No send slot for chat {chat_id}, dropping message")
+                return False
+            try:
+                async with self.slots:
+                    await bot.send_message(chat_id=chat_id, text=message.text)
+                return True
+            except TelegramRetryAfter as e:
+                delay = float(e.retry_after)
+            except (TelegramNetworkError, TelegramServerError) as e:
+                delay = min(settings.bot_outbound_retry_base_s * 2 ** (attempt - 1), 60.0)
+                logger.warning(f"[OUTBOUND] Send to chat {chat_id} failed (attempt {attempt}): {e}")
+            except TelegramAPIError as e:
+                # Blocked bot, deleted chat, bad request: retrying will not help
+                logger.error(f"[OUTBOUND] Send to chat {chat_id} rejected: {e}")
+                return False
+            await asyncio.sleep(delay)
+
+        logger.error(f"[OUTBOUND] Giving up on message to chat {chat_id} after {attempt} attempts")
+        return False
+
+
+# Global outbound queue instance
+outbound = OutboundQueue()
@@ -0,0 +1,70 @@
+"""Recent-contact exclusion cache for candidate filtering."""
+
+import time
+from collections.abc import Iterable
+
+import numpy as np
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.recent_contacts import RECENT_CONTACTS_CHANNEL
+from core.redis import listen_channel
+from models.recent_contact import RecentContact
+
+
+class RecentContactCache:
+    """
+    Per-user sorted arrays of other_ids the user must not be matched with.
+
+    An entry is valid until its earliest `until` (or the cache TTL) passes and
+    is then rebuilt lazily on the next lookup. Writers invalidate entries
+    through RECENT_CONTACTS_CHANNEL.
+    """
+
+    def __init__(self) -> None:
+        self.entries: dict[int, tuple[np.ndarray, float]] = {}  # user_id -> (sorted other_ids, valid until)
+
+    async def get_many(self, db: AsyncSession, user_ids: set[int]) -> dict[int, np.ndarray]:
+        """
+        Return blocked other_ids for each user, loading misses with one query.
+
+        Returns:
+            Mapping of user ID -> sorted int64 array of blocked user IDs
+        """
+        now = time.time()
+        missing = {user_id for user_id in user_ids if self.entries.get(user_id, (None, 0.0))[1] <= now}
+        if missing:
+            await self._load(db, missing, now)
+        return {user_id: self.entries[user_id][0] for user_id in user_ids}
+
+    def invalidate(self, user_ids: Iterable[int]) -> None:
+        """Drop cached entries so they are reloaded on next use."""
+        for user_id in user_ids:
+            self.entries.pop(user_id, None)
+
+    async def _load(self, db: AsyncSession, user_ids: set[int], now: float) -> None:
+        result = await db.execute(
+            select(RecentContact.user_id, RecentContact.other_id, RecentContact.until).where(
+                and_(RecentContact.user_id.in_(user_ids), RecentContact.until > func.now())
+            )
+        )
+        others: dict[int, list[int]] = {user_id: [] for user_id in user_ids}
+        valid_until = dict.fromkeys(user_ids, now + settings.match_contacts_cache_ttl_s)
+        for user_id, other_id, until in result.all():
+            others[user_id].append(other_id)
+            # The entry goes stale as soon as its first cooldown ends
+            valid_until[user_id] = min(valid_until[user_id], until.timestamp())
+        for user_id in user_ids:
+            self.entries[user_id] = (np.unique(np.array(others[user_id], dtype=np.int64)), valid_until[user_id])
+
+    async def listen(self) -> None:
+        """Apply RECENT_CONTACTS_CHANNEL invalidations until cancelled."""
+
+        async def handle(data: str) -> None:
+            self.invalidate(int(user_id) for user_id in data.split(",") if user_id)
+
+        async def resync() -> None:
+            self.entries.clear()
+
+        await listen_channel(RECENT_CONTACTS_CHANNEL, handle, resync)
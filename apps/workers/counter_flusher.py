@@ -0,0 +1,47 @@
+"""Background flusher for write-behind chat message counters."""
+
+import asyncio
+import logging
+
+from core.config import settings
+from core.message_counters import flush_message_counts, recover_stale_flushes
+
+logger = logging.getLogger(__name__)
+
+
+class MessageCounterFlusher:
+    """
+    Apply pending chat message counts every chat_counter_flush_interval_s.
+
+    Each round first recovers counts left behind by flushes of crashed
+    processes (see recover_stale_flushes).
+    """
+
+    def __init__(self) -> None:
+        self.running = False
+
+    async def run(self) -> None:
+        """Flush periodically until stopped or cancelled."""
+        self.running = True
+        while self.running:
+            await asyncio.sleep(settings.chat_counter_flush_interval_s)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Flush once, logging instead of raising.
+
+        Returns:
+            Number of chat sessions updated
+        """
+        try:
+            await recover_stale_flushes()
+            return await flush_message_counts()
+        except Exception as e:
+            logger.error(f"[COUNTER_FLUSHER] Flush failed: {e}", exc_info=True)
+            return 0
+
+    async def stop(self) -> None:
+        """Stop after the current interval and flush what is left."""
+        self.running = False
+        await self.flush()
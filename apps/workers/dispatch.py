@@ -0,0 +1,55 @@
+"""Bounded background dispatch for side effects such as Telegram notifications."""
+
+import asyncio
+import logging
+from collections.abc import Coroutine
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedDispatcher:
+    """
+    Run coroutines in the background with bounded concurrency.
+
+    At most `concurrency` coroutines run at once. Once `max_pending` are
+    queued or running, submit() waits for one to finish, so a slow
+    downstream applies backpressure instead of growing memory without bound.
+    """
+
+    def __init__(self, concurrency: int, max_pending: int) -> None:
+        self._slots = asyncio.Semaphore(concurrency)
+        self._max_pending = max(max_pending, concurrency)
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    @property
+    def pending(self) -> int:
+        """Number of queued or running coroutines."""
+        return len(self._tasks)
+
+    async def submit(self, coro: Coroutine[Any, Any, Any], name: str = "") -> None:
+        """
+        Schedule a coroutine, waiting only while the backlog is full.
+
+        Args:
+            coro: Coroutine to run; its exceptions are logged, not raised
+            name: Label used in error logs
+        """
+        while len(self._tasks) >= self._max_pending:
+            await asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED)
+
+        task = asyncio.create_task(self._run(coro, name))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def drain(self, timeout: float | None = None) -> None:
+        """Wait for every submitted coroutine to finish (or the timeout to pass)."""
+        if self._tasks:
+            await asyncio.wait(set(self._tasks), timeout=timeout)
+
+    async def _run(self, coro: Coroutine[Any, Any, Any], name: str) -> None:
+        async with self._slots:
+            try:
+                await coro
+            except Exception as e:
+                logger.error(f"[DISPATCH] {name or 'task'} failed: {e}", exc_info=True)
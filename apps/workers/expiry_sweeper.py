@@ -0,0 +1,104 @@
+"""Background sweeper that expires unanswered match proposals."""
+
+import asyncio
+import logging
+from datetime import datetime
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.workers.notifier import notifier
+from core.config import settings
+from core.db import AsyncSessionLocal
+from core.waiting_pool import requeue_unmatched
+from models.match import Match
+
+logger = logging.getLogger(__name__)
+
+
+class ExpirySweeper:
+    """
+    Flip `proposed` matches past `expires_at` to `expired` in set-based batches.
+
+    Each batch is one UPDATE over a keyset-paginated CTE (ORDER BY id, FOR
+    UPDATE SKIP LOCKED, so several workers can sweep at once). Freed users go
+    back to the waiting pool and are notified in bulk.
+    """
+
+    def __init__(self) -> None:
+        self.running = False
+
+    async def run(self) -> None:
+        """Sweep every match_expiry_sweep_interval_s until stopped or cancelled."""
+        self.running = True
+        while self.running:
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"[EXPIRY_SWEEPER] Sweep failed: {e}", exc_info=True)
+            await asyncio.sleep(settings.match_expiry_sweep_interval_s)
+
+    async def sweep(self) -> int:
+        """
+        Expire every overdue proposal.
+
+        Returns:
+            Number of matches expired
+        """
+        now = datetime.utcnow()
+        last_id = 0
+        total = 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                rows = await self._expire_batch(db, now, last_id)
+                if not rows:
+                    break
+                user_ids = sorted({user_id for _, user_a, user_b in rows for user_id in (user_a, user_b)})
+                requeued = await requeue_unmatched(db, user_ids)
+                await notifier.send_match_expired(db, requeued)
+
+            total += len(rows)
+            last_id = max(match_id for match_id, _, _ in rows)
+            if len(rows) < settings.match_expiry_sweep_batch:
+                break
+
+        if total:
+            logger.info(f"[EXPIRY_SWEEPER] Expired {total} proposal(s)")
+        return total
+
+    async def _expire_batch(self, db: AsyncSession, now: datetime, last_id: int) -> list[tuple[int, int, int]]:
+        """Expire the next batch after last_id and return (match_id, user_a, user_b) rows."""
+        batch = (
+            select(Match.id)
+            .where(Match.status == "proposed", Match.expires_at < now, Match.id > last_id)
+            .order_by(Match.id)
+            .limit(settings.match_expiry_sweep_batch)
+            .with_for_update(skip_locked=True)
+            .cte("expired_batch")
+        )
+        result = await db.execute(
+            update(Match)
+            .where(Match.id == batch.c.id)
+            .values(status="expired")
+            .returning(Match.id, Match.user_a, Match.user_b)
+        )
+        rows = [tuple(row) for row in result.all()]
+        await db.commit()
+        return rows
+
+    async def stop(self) -> None:
+        """Stop after the current sweep."""
+        self.running = False
+
+
+async def main() -> None:
+    """Run the sweeper standalone."""
+    sweeper = ExpirySweeper()
+    try:
+        await sweeper.run()
+    except KeyboardInterrupt:
+        await sweeper.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
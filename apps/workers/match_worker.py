@@ -1,17 +1,45 @@
 """Match worker for processing match queue."""
 
 import asyncio
+import os
+import socket
+import time
 from datetime import datetime, timedelta
+from typing import Any
 
-from sqlalchemy import and_, func, select
+import numpy as np
+from prometheus_client import start_http_server
+from sqlalchemy import and_, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from apps.workers.contact_cache import RecentContactCache
+from apps.workers.dispatch import BoundedDispatcher
+from apps.workers.expiry_sweeper import ExpirySweeper
 from apps.workers.notifier import notifier
+from apps.workers.pairing import solve_pairs
+from apps.workers.stage_timer import StageTimer
+from apps.workers.topic_index import TopicIndex
+from core.config import settings
 from core.db import AsyncSessionLocal
+from core.dead_letter import failure_record, requeue_due_retries, schedule_failure
+from core.match_payload import MatchRequest, decode_match_request, payload_user_id
+from core.match_streams import all_find_streams, owned_find_streams
+from core.metrics import (
+    batch_size_label,
+    match_batch_duration_seconds,
+    match_batch_throughput,
+    match_queue_size,
+    match_requests_total,
+    match_stage_duration_seconds,
+    match_worker_lag_ms,
+    matches_created_total,
+)
 from core.redis import get_redis
+from core.topic_catalog import topic_catalog
+from core.waiting_pool import live_searchers, release_searches, remove_from_waiting_pool, searching_users
 from models.match import Match
-from models.recent_contact import RecentContact
-from models.topic import Topic, UserTopic
 
 
 class MatchWorker:
@@ -19,80 +47,113 @@ class MatchWorker:
 
     def __init__(self) -> None:
         self.running = False
+        # Owned shards are read continuously; the rest only when their owners fall behind
+        self.streams = owned_find_streams()
+        self.fallback_streams = [stream for stream in all_find_streams() if stream not in self.streams]
+        self.group_name = "matchers"
+        # Unique per process so several replicas can share the consumer group
+        self.consumer_name = settings.match_consumer_name or f"{socket.gethostname()}-{os.getpid()}"
+        self._last_reclaim = 0.0
+        self.topic_index = TopicIndex()
+        self.contact_cache = RecentContactCache()
+        self.expiry_sweeper = ExpirySweeper()
+        self.stages = StageTimer()
+        self._last_lag_sample = 0.0
+        self._listeners: list[asyncio.Task[None]] = []
+        # Notifications run beside the consume loop so slow Telegram calls don't stall matching
+        self.notifications = BoundedDispatcher(settings.match_notify_concurrency, settings.match_notify_max_pending)
+        self._last_index_load = 0.0
+        self._last_tz_refresh = 0.0
+        self._last_fallback = 0.0
+        # Pool mode: entries (stream, message ID, data) collected during the current tick
+        self._pool: list[tuple[str, str, dict[str, str]]] = []
+        self._pool_started = 0.0
 
     async def start(self) -> None:
         """Start the match worker."""
         self.running = True
         redis_client = await get_redis()
 
-        stream_name = "match.find"
-        group_name = "matchers"
-        consumer_name = "worker-1"
-
-        print(f"Match worker started, consuming from {stream_name}...")
+        print(
+            f"Match worker {self.consumer_name} started, consuming from {', '.join(self.streams)} "
+            f"(batch_size={settings.match_batch_size}, pool_mode={settings.match_pool_mode})..."
+        )
 
-        # Create consumer group if not exists
-        try:
-            await redis_client.xgroup_create(name=stream_name, groupname=group_name, id="0", mkstream=True)
-            print(f"Created consumer group: {group_name}")
-        except Exception as e:
-            if "BUSYGROUP" not in str(e):
-                print(f"Error creating group: {e}")
+        # Create consumer groups if not exists (fallback shards too, so their lag can be inspected)
+        for stream in self.streams + self.fallback_streams:
+            try:
+                await redis_client.xgroup_create(name=stream, groupname=self.group_name, id="0", mkstream=True)
+                print(f"Created consumer group: {self.group_name} on {stream}")
+            except Exception as e:
+                if "BUSYGROUP" not in str(e):
+                    print(f"Error creating group on {stream}: {e}")
+
+        await self.topic_index.load()
+        self._last_index_load = time.monotonic()
+        self._listeners = [
+            asyncio.create_task(self.topic_index.listen()),
+            asyncio.create_task(self.topic_index.listen_reputation()),
+            asyncio.create_task(self.contact_cache.listen()),
+            asyncio.create_task(self.expiry_sweeper.run()),
+        ]
 
         while self.running:
             try:
-                # Read from Redis stream with blocking
+                # Full index rebuild as a safety net for missed change notifications
+                if time.monotonic() - self._last_index_load >= settings.match_topic_index_refresh_s:
+                    self._last_index_load = time.monotonic()
+                    await self.topic_index.load()
+
+                # Recompute UTC offsets so DST transitions are picked up
+                if time.monotonic() - self._last_tz_refresh >= settings.match_tz_refresh_s:
+                    self._last_tz_refresh = time.monotonic()
+                    self.topic_index.timezones.refresh()
+
+                # Periodically take over entries left pending by crashed replicas
+                if time.monotonic() - self._last_reclaim >= settings.match_claim_interval_s:
+                    self._last_reclaim = time.monotonic()
+                    await self._reclaim_pending(redis_client)
+                    await self._cleanup_idle_consumers(redis_client)
+
+                # Export queue size and lag from the consumer groups
+                if time.monotonic() - self._last_lag_sample >= settings.match_metrics_interval_s:
+                    self._last_lag_sample = time.monotonic()
+                    await self._sample_queue_lag(redis_client)
+
+                # Put failed entries whose backoff has elapsed back on their stream
+                requeued = await requeue_due_retries()
+                if requeued:
+                    print(f"[WORKER] Requeued {requeued} entry(ies) for retry")
+
+                # Help out on shards whose owners have fallen behind
+                if self.fallback_streams and time.monotonic() - self._last_fallback >= settings.match_shard_fallback_s:
+                    self._last_fallback = time.monotonic()
+                    await self._drain_lagging_shards(redis_client)
+
+                # Read up to match_batch_size entries per owned stream with blocking
                 messages = await redis_client.xreadgroup(
-                    groupname=group_name,
-                    consumername=consumer_name,
-                    streams={stream_name: ">"},
-                    count=1,
-                    block=5000,  # 5 seconds timeout
+                    groupname=self.group_name,
+                    consumername=self.consumer_name,
+                    streams=dict.fromkeys(self.streams, ">"),
+                    count=settings.match_batch_size,
+                    block=self._block_ms(),
                 )
 
                 if messages:
                     for stream_key, stream_messages in messages:
-                        for message_id, message_data in stream_messages:
-                            print(f"Processing message {message_id}: {message_data}")
-
-                            try:
-                                # Extract data
-                                user_id = int(message_data["user_id"])
-                                topics = message_data["topics"].split(",")
-                                timezone = message_data["timezone"]
-
-                                # Process match request
-                                match = await self.process_match_request(user_id, topics, timezone)
-
-                                if match:
-                                    print(f"[WORKER] Created match: {match.id}")
-                                    # Send notification to both users via bot
-                                    print(f"[WORKER] Sending notifications for match {match.id}...")
-                                    async with AsyncSessionLocal() as db:
-                                        print(f"[WORKER] Notifying user_a={match.user_a}...")
-                                        result_a = await notifier.send_match_proposal(
-                                            db, match.id, match.user_a, match.user_b
-                                        )
-                                        print(f"[WORKER] User A notification result: {result_a}")
-
-                                        print(f"[WORKER] Notifying user_b={match.user_b}...")
-                                        result_b = await notifier.send_match_proposal(
-                                            db, match.id, match.user_b, match.user_a
-                                        )
-                                        print(f"[WORKER] User B notification result: {result_b}")
-
-                                    print(f"[WORKER] ✅ Match {match.id} notifications completed")
-                                else:
-                                    print(f"[WORKER] No match found for user {user_id}")
-
-                                # Acknowledge message
-                                await redis_client.xack(stream_name, group_name, message_id)
-
-                            except Exception as e:
-                                print(f"Error processing message {message_id}: {e}")
-                                # Move to dead letter queue
-                                await redis_client.xadd("match.dead", message_data)
-                                await redis_client.xack(stream_name, group_name, message_id)
+                        entries = [(stream_key, message_id, data) for message_id, data in stream_messages]
+                        if settings.match_pool_mode:
+                            if not self._pool:
+                                self._pool_started = time.monotonic()
+                            self._pool.extend(entries)
+                        else:
+                            await self._handle_batch(redis_client, entries)
+
+                if self._pool and (
+                    self._block_ms() <= 1 or len(self._pool) >= settings.match_pool_max_size or not self.running
+                ):
+                    pool, self._pool = self._pool, []
+                    await self._handle_batch(redis_client, pool, pooled=True)
 
             except Exception as e:
                 print(f"Error in match worker loop: {e}")
@@ -101,6 +162,241 @@ class MatchWorker:
     async def stop(self) -> None:
         """Stop the match worker."""
         self.running = False
+        for listener in self._listeners:
+            listener.cancel()
+        await self.notifications.drain(timeout=30)
+
+    def _block_ms(self) -> int:
+        """XREADGROUP block timeout: the rest of the current pool tick, if one is open."""
+        if not self._pool:
+            return settings.match_block_ms
+        elapsed_ms = (time.monotonic() - self._pool_started) * 1000
+        return max(1, int(settings.match_pool_tick_ms - elapsed_ms))
+
+    async def _reclaim_pending(self, redis_client: Any) -> None:
+        """
+        Claim and process entries idle past match_claim_idle_ms (XAUTOCLAIM).
+
+        Pending entries on shards owned by other workers are only taken over
+        once they have also waited match_shard_fallback_s.
+        """
+        for stream in self.streams + self.fallback_streams:
+            min_idle_ms = settings.match_claim_idle_ms
+            if stream in self.fallback_streams:
+                min_idle_ms = max(min_idle_ms, settings.match_shard_fallback_s * 1000)
+
+            start_id = "0-0"
+            while True:
+                next_id, claimed, *_ = await redis_client.xautoclaim(
+                    name=stream,
+                    groupname=self.group_name,
+                    consumername=self.consumer_name,
+                    min_idle_time=min_idle_ms,
+                    start_id=start_id,
+                    count=settings.match_batch_size,
+                )
+                # Entries trimmed from the stream come back without data
+                entries = [(stream, message_id, data) for message_id, data in claimed if data]
+                if entries:
+                    print(f"[WORKER] Reclaimed {len(entries)} stale pending message(s) from {stream}")
+                    await self._handle_batch(redis_client, entries)
+                if next_id in ("0-0", b"0-0"):
+                    break
+                start_id = next_id
+
+    async def _drain_lagging_shards(self, redis_client: Any) -> None:
+        """Read one batch from each non-owned shard whose oldest undelivered entry is older than the fallback wait."""
+        cutoff_ms = (time.time() - settings.match_shard_fallback_s) * 1000
+        for stream in self.fallback_streams:
+            groups = await redis_client.xinfo_groups(stream)
+            group = next((group for group in groups if group["name"] == self.group_name), None)
+            if group is None:
+                continue
+
+            # Stream IDs start with the entry's creation time in milliseconds
+            oldest = await redis_client.xrange(stream, min=f"({group['last-delivered-id']}", count=1)
+            if not oldest or int(oldest[0][0].split("-")[0]) > cutoff_ms:
+                continue
+
+            messages = await redis_client.xreadgroup(
+                groupname=self.group_name,
+                consumername=self.consumer_name,
+                streams={stream: ">"},
+                count=settings.match_batch_size,
+            )
+            for stream_key, stream_messages in messages or []:
+                print(f"[WORKER] Shard {stream_key} is lagging, taking over {len(stream_messages)} message(s)")
+                await self._handle_batch(
+                    redis_client, [(stream_key, message_id, data) for message_id, data in stream_messages]
+                )
+
+    async def _sample_queue_lag(self, redis_client: Any) -> None:
+        """
+        Update match_queue_size and match_worker_lag_ms from XINFO GROUPS and XPENDING.
+
+        Lag is the age of the oldest entry not yet acknowledged: the oldest
+        pending entry, or else the first entry not yet delivered to the group.
+        """
+        now_ms = time.time() * 1000
+        total = 0
+        for stream in self.streams + self.fallback_streams:
+            groups = await redis_client.xinfo_groups(stream)
+            group = next((group for group in groups if group["name"] == self.group_name), None)
+            if group is None:
+                continue
+            total += (group.get("lag") or 0) + group["pending"]
+
+            oldest_id = None
+            if group["pending"]:
+                pending = await redis_client.xpending(stream, self.group_name)
+                oldest_id = pending["min"]
+            else:
+                undelivered = await redis_client.xrange(stream, min=f"({group['last-delivered-id']}", count=1)
+                if undelivered:
+                    oldest_id = undelivered[0][0]
+            lag_ms = now_ms - int(oldest_id.split("-")[0]) if oldest_id else 0.0
+            match_worker_lag_ms.labels(stream=stream).set(max(0.0, lag_ms))
+        match_queue_size.set(total)
+
+    async def _cleanup_idle_consumers(self, redis_client: Any) -> None:
+        """Remove consumers that are long idle and own no pending entries."""
+        for stream in self.streams + self.fallback_streams:
+            consumers = await redis_client.xinfo_consumers(stream, self.group_name)
+            for consumer in consumers:
+                name = consumer["name"]
+                if name == self.consumer_name:
+                    continue
+                if consumer["pending"] == 0 and consumer["idle"] >= settings.match_consumer_idle_ms:
+                    await redis_client.xgroup_delconsumer(stream, self.group_name, name)
+                    print(f"[WORKER] Removed idle consumer {name} from {stream}")
+
+    async def _handle_batch(
+        self, redis_client: Any, entries: list[tuple[str, str, dict[str, str]]], pooled: bool = False
+    ) -> None:
+        """
+        Process a batch of stream entries and acknowledge them in one round trip.
+
+        Entries are (stream, message ID, data) so one batch may span shards.
+        Entries that fail processing are retried with exponential backoff and
+        moved to match.dead, with error context, once attempts run out.
+        Undecodable entries are dead-lettered immediately.
+        With pooled=True the batch is paired globally (see process_match_pool).
+        """
+        started = time.perf_counter()
+        self.stages.reset()
+        print(f"[WORKER] Processing batch of {len(entries)} message(s)")
+        match_requests_total.inc(len(entries))
+
+        # Dequeue stage: how long each entry sat in its stream (IDs start with the XADD time in ms)
+        now_ms = time.time() * 1000
+        max_wait_ms = 0.0
+        for _, message_id, _ in entries:
+            wait_ms = max(0.0, now_ms - int(message_id.split("-")[0]))
+            max_wait_ms = max(max_wait_ms, wait_ms)
+            match_stage_duration_seconds.labels(stage="dequeue").observe(wait_ms / 1000)
+
+        decoded: list[tuple[str, MatchRequest]] = []
+        failed: list[tuple[dict[str, str], bool]] = []  # (failure record, retryable)
+        for stream, message_id, message_data in entries:
+            try:
+                decoded.append((message_id, decode_match_request(message_data)))
+            except (KeyError, ValueError) as e:
+                print(f"Error decoding message {message_id}: {e}")
+                failed.append((failure_record(message_data, e, stream), False))
+
+        # Coalesce duplicate /find taps: keep each user's latest entry, and only while they are still searching
+        latest = {request.user_id: message_id for message_id, request in decoded}
+        searching = await searching_users(latest)
+        received = len(decoded)
+        decoded = [
+            (message_id, request)
+            for message_id, request in decoded
+            if latest[request.user_id] == message_id and request.user_id in searching
+        ]
+        if len(decoded) < received:
+            print(f"[WORKER] Coalesced {received - len(decoded)} duplicate or stale request(s)")
+
+        matches: list[Match | None] = []
+        # Matches committed so far, kept across the fallback so nobody is proposed twice
+        matched: dict[int, Match] = {}
+        try:
+            process = self.process_match_pool if pooled else self.process_match_batch
+            matches = await process([request for _, request in decoded], matched)
+        except Exception as e:
+            # Shared batch failed - retry entries one by one so a single bad entry doesn't poison the rest
+            print(f"Batch processing failed, falling back to per-message processing: {e}")
+            matches = []
+            entry_by_id = {message_id: (stream, message_data) for stream, message_id, message_data in entries}
+            for message_id, request in decoded:
+                if request.user_id in matched:
+                    # Already matched before the failure; still needs its notification
+                    matches.append(matched[request.user_id])
+                    continue
+                try:
+                    matches.append((await self.process_match_batch([request], matched))[0])
+                except Exception as inner:
+                    print(f"Error processing message {message_id}: {inner}")
+                    stream, message_data = entry_by_id[message_id]
+                    failed.append((failure_record(message_data, inner, stream), True))
+                    matches.append(None)
+
+        notified: set[int] = set()
+        for (message_id, request), match in zip(decoded, matches, strict=True):
+            if match:
+                # Both sides of a pooled pair (or a reused open match) map to the same row
+                if match.id in notified:
+                    continue
+                notified.add(match.id)
+                print(f"[WORKER] Created match: {match.id}")
+                matches_created_total.labels(status="proposed").inc()
+                await self.notifications.submit(self._notify_match(match), name=f"notify match {match.id}")
+            else:
+                print(f"[WORKER] No match found for user {request.user_id}")
+
+        # Schedule retries / dead-letter failures and acknowledge the whole batch in a single pipeline
+        pipe = redis_client.pipeline(transaction=False)
+        retrying: set[int | None] = set()
+        for record, retryable in failed:
+            if schedule_failure(pipe, record, retryable):
+                retrying.add(payload_user_id(record))
+            else:
+                print(f"[WORKER] Dead-lettered entry for user {payload_user_id(record)} ({record['dlq_error']})")
+        ids_by_stream: dict[str, list[str]] = {}
+        for stream, message_id, _ in entries:
+            ids_by_stream.setdefault(stream, []).append(message_id)
+        for stream, message_ids in ids_by_stream.items():
+            pipe.xack(stream, self.group_name, *message_ids)
+        # The users' searches are no longer in flight - a new /find may enqueue again (retried ones still are)
+        release_searches(
+            pipe, {user_id: message_id for user_id, message_id in latest.items() if user_id not in retrying}
+        )
+        await pipe.execute()
+
+        elapsed = time.perf_counter() - started
+        print(
+            f"[WORKER] Batch timing: total={elapsed * 1000:.1f}ms max_queue_wait={max_wait_ms:.0f}ms "
+            f"{self.stages.summary()}"
+        )
+        batch_label = batch_size_label(len(entries))
+        match_batch_duration_seconds.labels(batch_size=batch_label).observe(elapsed)
+        if elapsed > 0:
+            match_batch_throughput.labels(batch_size=batch_label).set(len(entries) / elapsed)
+
+    async def _notify_match(self, match: Match) -> None:
+        """Send match proposal to both users via bot, concurrently."""
+        print(f"[WORKER] Sending notifications for match {match.id}...")
+        started = time.perf_counter()
+
+        async def send(user_id: int, partner_id: int) -> bool:
+            # One session per send: an AsyncSession must not be used concurrently
+            async with AsyncSessionLocal() as db:
+                return await notifier.send_match_proposal(db, match.id, user_id, partner_id)
+
+        result_a, result_b = await asyncio.gather(send(match.user_a, match.user_b), send(match.user_b, match.user_a))
+        print(f"[WORKER] User A notification result: {result_a}")
+        print(f"[WORKER] User B notification result: {result_b}")
+        match_stage_duration_seconds.labels(stage="notify").observe(time.perf_counter() - started)
+        print(f"[WORKER] ✅ Match {match.id} notifications completed")
 
     async def process_match_request(self, user_id: int, topics: list[str], timezone: str) -> Match | None:
         """
@@ -114,150 +410,310 @@ class MatchWorker:
         Returns:
             Match object if found, None otherwise
         """
-        async with AsyncSessionLocal() as db:
-            # Find candidates with overlapping topics
-            candidates = await self._find_candidates(db, user_id, topics, timezone)
-
-            if not candidates:
-                return None
-
-            # Score candidates
-            best_candidate = await self._score_candidates(db, user_id, candidates, topics)
-
-            if not best_candidate:
-                return None
-
-            # Create match with 5 minute expiry
-            # Use ordered pair (u_lo, u_hi) to prevent duplicate matches
-            u_lo, u_hi = sorted([user_id, best_candidate])
-            expires_at = datetime.utcnow() + timedelta(minutes=5)
-
-            match = Match(
-                user_a=user_id,
-                user_b=best_candidate,
-                u_lo=u_lo,
-                u_hi=u_hi,
-                status="proposed",
-                expires_at=expires_at,
-            )
+        matches = await self.process_match_batch([MatchRequest(user_id=user_id, topics=topics, timezone=timezone)])
+        return matches[0]
 
-            try:
-                db.add(match)
-                await db.commit()
-                await db.refresh(match)
-                return match
-            except Exception as e:
-                # Handle duplicate match race condition (unique index violation)
-                await db.rollback()
-                print(f"Match creation failed (likely duplicate open match): {e}")
-                # Try to find existing OPEN match (proposed OR active)
-                from sqlalchemy import and_, or_, select
-
-                result = await db.execute(
-                    select(Match).where(
-                        and_(
-                            Match.u_lo == u_lo,
-                            Match.u_hi == u_hi,
-                            or_(Match.status == "proposed", Match.status == "active"),
-                        )
-                    )
-                )
-                existing_match = result.scalar_one_or_none()
-                if existing_match:
-                    print(
-                        f"Found existing open match: {existing_match.id} (status={existing_match.status}), reusing it"
-                    )
-                    return existing_match
-                # If no existing open match found, this is unexpected - log and re-raise
-                print(f"ERROR: IntegrityError but no open match found for u_lo={u_lo}, u_hi={u_hi}")
-                raise
+    async def process_match_batch(
+        self, requests: list[MatchRequest], matched: dict[int, Match] | None = None
+    ) -> list[Match | None]:
+        """
+        Process several match requests with shared DB work.
 
-    async def _find_candidates(self, db: AsyncSession, user_id: int, topics: list[str], timezone: str) -> list[int]:
-        """Find potential match candidates."""
-        # Get topic IDs from slugs
-        topic_result = await db.execute(select(Topic.id).where(Topic.slug.in_(topics)))
-        topic_ids = [row[0] for row in topic_result.all()]
+        Topic slugs are resolved from the in-memory topic catalog and recent
+        contacts come from the exclusion cache; candidates come from the
+        in-memory topic index, restricted to users currently in the Redis waiting pool. A user
+        matched earlier in the batch is not offered to later requests. Matched
+        users leave the waiting pool as soon as their match is committed.
 
-        if len(topic_ids) < 2:
+        Args:
+            requests: Decoded match.find entries
+            matched: Users already matched (user ID -> match), who must not be proposed;
+                updated in place with every match created here
+
+        Returns:
+            Match (or None) for each request, in the same order
+        """
+        if not requests:
             return []
 
-        # Find users with ≥2 overlapping topics
-        # Exclude: self, recent contacts
-        query = (
-            select(UserTopic.user_id, func.count(UserTopic.topic_id).label("shared_count"))
-            .where(
-                and_(
-                    UserTopic.topic_id.in_(topic_ids),
-                    UserTopic.user_id != user_id,
-                    # Exclude recent contacts
-                    ~UserTopic.user_id.in_(
-                        select(RecentContact.other_id).where(
-                            and_(RecentContact.user_id == user_id, RecentContact.until > datetime.utcnow())
-                        )
-                    ),
-                )
-            )
-            .group_by(UserTopic.user_id)
-            .having(func.count(UserTopic.topic_id) >= 2)
-            .limit(10)
-        )
+        if not self.topic_index.loaded:
+            await self.topic_index.load()
+
+        async with AsyncSessionLocal() as db:
+            with self.stages.stage("resolve_topics"):
+                request_topics = await self._request_topic_ids(requests)
+            with self.stages.stage("candidate_search"):
+                recent_contacts = await self.contact_cache.get_many(db, {request.user_id for request in requests})
+                live = await live_searchers(set().union(*request_topics))
+                live_ids = np.fromiter(live, dtype=np.int64, count=len(live))
+
+            results: list[Match | None] = []
+            matched = {} if matched is None else matched
+            for request, topic_ids in zip(requests, request_topics, strict=True):
+                if request.user_id in matched:
+                    results.append(None)
+                    continue
+
+                # The request carries the user's full topic set - keep the index in sync with it
+                self.topic_index.set_user_topics(request.user_id, topic_ids, request.timezone)
+                tz_code = self.topic_index.timezones.code_of(request.timezone)
+                excluded = recent_contacts[request.user_id]
+                if matched:
+                    excluded = np.concatenate([excluded, np.fromiter(matched, dtype=np.int64, count=len(matched))])
+
+                # Find candidates with overlapping topics
+                with self.stages.stage("candidate_search"):
+                    candidate_ids, rows = self._find_candidates(request.user_id, topic_ids, excluded, tz_code, live_ids)
+
+                # Score candidates
+                with self.stages.stage("scoring"):
+                    best_candidate = self._score_candidates(topic_ids, candidate_ids, rows, tz_code)
+
+                if best_candidate is None:
+                    results.append(None)
+                    continue
+
+                with self.stages.stage("insert"):
+                    match = await self._create_match(db, request.user_id, best_candidate)
+                if match:
+                    matched[match.user_a] = matched[match.user_b] = match
+                    # Matched users stop searching; done per commit so a later failure can't leave them pooled
+                    await remove_from_waiting_pool((match.user_a, match.user_b))
+                results.append(match)
+
+        return results
+
+    async def process_match_pool(
+        self, requests: list[MatchRequest], matched: dict[int, Match] | None = None
+    ) -> list[Match | None]:
+        """
+        Pair a pool of requests with a global maximum-weight matching.
 
-        result = await db.execute(query)
-        candidates = [row[0] for row in result.all()]
+        All pair scores inside the pool are computed in one pass and the
+        resulting matches are inserted in a single transaction. Requests left
+        unpaired fall back to greedy matching against the waiting pool.
 
-        # TODO: Filter by timezone compatibility (±3 hours)
-        return candidates
+        Args:
+            requests: Decoded match.find entries collected during one tick
+            matched: Updated in place with every match created (user ID -> match)
 
-    async def _score_candidates(
-        self, db: AsyncSession, user_id: int, candidates: list[int], topics: list[str]
-    ) -> int | None:
+        Returns:
+            Match (or None) for each request, in the same order
         """
-        Score and rank candidates.
+        if not requests:
+            return []
 
-        Scoring formula: 0.6 * tag_overlap + 0.2 * time_overlap + 0.2 * helpfulness_score
+        if not self.topic_index.loaded:
+            await self.topic_index.load()
+
+        async with AsyncSessionLocal() as db:
+            with self.stages.stage("resolve_topics"):
+                request_topics = await self._request_topic_ids(requests)
+            topics_by_user: dict[int, set[int]] = {}
+            for request, topic_ids in zip(requests, request_topics, strict=True):
+                topics_by_user[request.user_id] = topic_ids
+                self.topic_index.set_user_topics(request.user_id, topic_ids, request.timezone)
+
+            user_ids = [user_id for user_id, topic_ids in topics_by_user.items() if len(topic_ids) >= 2]
+            with self.stages.stage("candidate_search"):
+                recent_contacts = await self.contact_cache.get_many(db, set(user_ids))
+            with self.stages.stage("scoring"):
+                scores, eligible = self._pool_scores(user_ids, recent_contacts)
+            with self.stages.stage("pairing"):
+                pairs = [(user_ids[i], user_ids[j]) for i, j in await solve_pairs(scores, eligible)]
+            with self.stages.stage("insert"):
+                created = await self._create_matches_bulk(db, pairs)
+
+        matched = {} if matched is None else matched
+        pooled: dict[int, Match] = {}
+        for match in created:
+            pooled[match.user_a] = pooled[match.user_b] = match
+        matched.update(pooled)
+        await remove_from_waiting_pool(pooled)
+        print(f"[WORKER] Pool of {len(requests)} request(s) produced {len(created)} match(es)")
+
+        leftovers = [request for request in requests if request.user_id not in pooled]
+        leftover_matches = iter(await self.process_match_batch(leftovers, matched))
+        return [pooled.get(request.user_id) or next(leftover_matches) for request in requests]
+
+    def _pool_scores(
+        self, user_ids: list[int], recent_contacts: dict[int, np.ndarray]
+    ) -> tuple[np.ndarray, np.ndarray]:
         """
-        if not candidates:
-            return None
+        Score every pair inside a pool.
 
-        # Get topic IDs from slugs
-        topic_result = await db.execute(select(Topic.id).where(Topic.slug.in_(topics)))
-        user_topic_ids = {row[0] for row in topic_result.all()}
+        Returns:
+            (pair scores, eligible pairs) as symmetric (n, n) arrays over user_ids positions
+        """
+        rows = np.fromiter((self.topic_index.rows[user_id] for user_id in user_ids), dtype=np.int64)
+        shared, weighted = self.topic_index.pairwise_overlap(rows)
+
+        tz_codes = self.topic_index.tz_codes[rows]
+        tz_pairs = np.ix_(tz_codes, tz_codes)
+
+        # Same formula as _score_candidates; tag overlap averaged over both directions
+        tag_score = np.minimum((weighted + weighted.T) / 2 / 5.0, 1.0)
+        time_score = self.topic_index.timezones.overlap[tz_pairs]
+        helpfulness = self.topic_index.helpfulness[rows]
+        helpfulness_score = (helpfulness[:, None] + helpfulness[None, :]) / 2
+        total_score = 0.6 * tag_score + 0.2 * time_score + 0.2 * helpfulness_score
+
+        eligible = (shared >= 2) & self.topic_index.timezones.compatible[tz_pairs]
+        np.fill_diagonal(eligible, False)
+        position = {user_id: i for i, user_id in enumerate(user_ids)}
+        for user_id, others in recent_contacts.items():
+            for other_id in others.tolist():
+                if other_id in position:
+                    eligible[position[user_id], position[other_id]] = False
+                    eligible[position[other_id], position[user_id]] = False
+
+        return total_score, eligible
+
+    async def _create_matches_bulk(self, db: AsyncSession, pairs: list[tuple[int, int]]) -> list[Match]:
+        """Insert proposed matches for all pairs in one statement, skipping pairs that already have an open match."""
+        if not pairs:
+            return []
 
-        best_candidate = None
-        best_score = -1.0
+        now = datetime.utcnow()
+        expires_at = now + timedelta(minutes=5)
+        stmt = (
+            insert(Match)
+            .values(
+                [
+                    {
+                        "user_a": user_a,
+                        "user_b": user_b,
+                        "u_lo": min(user_a, user_b),
+                        "u_hi": max(user_a, user_b),
+                        "status": "proposed",
+                        "created_at": now,
+                        "expires_at": expires_at,
+                    }
+                    for user_a, user_b in pairs
+                ]
+            )
+            .on_conflict_do_nothing()
+            .returning(Match)
+        )
+        matches = list((await db.scalars(stmt)).all())
+        await db.commit()
+        return matches
+
+    async def _request_topic_ids(self, requests: list[MatchRequest]) -> list[set[int]]:
+        """Topic IDs of each request; packed entries carry them, legacy ones are resolved via the catalog."""
+        slugs = {slug for request in requests if request.topic_ids is None for slug in request.topics}
+        slug_to_id = await topic_catalog.ids_for(slugs) if slugs else {}
+        return [
+            request.topic_ids
+            if request.topic_ids is not None
+            else {slug_to_id[slug] for slug in request.topics if slug in slug_to_id}
+            for request in requests
+        ]
+
+    async def _create_match(self, db: AsyncSession, user_id: int, candidate_id: int) -> Match | None:
+        """Create a proposed match, reusing an existing open match on a duplicate-pair race."""
+        # Create match with 5 minute expiry
+        # Use ordered pair (u_lo, u_hi) to prevent duplicate matches
+        u_lo, u_hi = sorted([user_id, candidate_id])
+        expires_at = datetime.utcnow() + timedelta(minutes=5)
+
+        match = Match(
+            user_a=user_id,
+            user_b=candidate_id,
+            u_lo=u_lo,
+            u_hi=u_hi,
+            status="proposed",
+            expires_at=expires_at,
+        )
 
-        for candidate_id in candidates:
-            # Get candidate's topics
-            candidate_topics_result = await db.execute(
-                select(UserTopic.topic_id).where(UserTopic.user_id == candidate_id)
+        try:
+            db.add(match)
+            await db.commit()
+            await db.refresh(match)
+            # Detach so a later rollback in the same batch session doesn't expire it
+            db.expunge(match)
+            return match
+        except IntegrityError as e:
+            # Handle duplicate match race condition (unique index violation)
+            await db.rollback()
+            print(f"Match creation failed (likely duplicate open match): {e}")
+            # Try to find existing OPEN match (proposed OR active)
+            result = await db.execute(
+                select(Match).where(
+                    and_(
+                        Match.u_lo == u_lo,
+                        Match.u_hi == u_hi,
+                        or_(Match.status == "proposed", Match.status == "active"),
+                    )
+                )
             )
-            candidate_topic_ids = {row[0] for row in candidate_topics_result.all()}
+            existing_match = result.scalar_one_or_none()
+            if existing_match:
+                print(f"Found existing open match: {existing_match.id} (status={existing_match.status}), reusing it")
+                db.expunge(existing_match)
+                return existing_match
+            # If no existing open match found, this is unexpected - log and re-raise
+            print(f"ERROR: IntegrityError but no open match found for u_lo={u_lo}, u_hi={u_hi}")
+            raise
+
+    def _find_candidates(
+        self, user_id: int, topic_ids: set[int], excluded: np.ndarray, tz_code: int, live_ids: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find potential match candidates.
+
+        Candidates are live searchers sharing ≥2 topics within ±3h timezone,
+        excluding self and recent contacts.
+
+        Returns:
+            (candidate user IDs, topic index rows) as aligned arrays
+        """
+        if len(topic_ids) < 2:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        candidate_ids, rows = self.topic_index.candidates(user_id, topic_ids, min_shared=2)
 
-            # Calculate shared topics
-            shared_topics = user_topic_ids & candidate_topic_ids
-            shared_count = len(shared_topics)
+        # Timezone compatibility is a lookup into the precomputed code x code table
+        keep = self.topic_index.timezones.compatible[tz_code, self.topic_index.tz_codes[rows]]
+        keep &= np.isin(candidate_ids, live_ids)
+        if excluded.size:
+            keep &= ~np.isin(candidate_ids, excluded)
+        return candidate_ids[keep], rows[keep]
 
-            # Tag overlap score: min(shared / 5, 1.0) to normalize
-            tag_score = min(shared_count / 5.0, 1.0)
+    def _score_candidates(
+        self, topic_ids: set[int], candidate_ids: np.ndarray, rows: np.ndarray, tz_code: int
+    ) -> int | None:
+        """
+        Score and rank all candidates in one vectorized pass.
+
+        Scoring formula: 0.6 * tag_overlap + 0.2 * time_overlap + 0.2 * helpfulness_score
+        """
+        if not candidate_ids.size:
+            return None
 
-            # Time overlap: placeholder (TODO: implement timezone check)
-            time_score = 0.5  # Assume 50% overlap for now
+        total_score = self._candidate_scores(topic_ids, rows, tz_code)
+        return int(candidate_ids[np.argmax(total_score)])
 
-            # Helpfulness score: placeholder (TODO: implement based on ratings)
-            helpfulness_score = 0.5  # Neutral score
+    def _candidate_scores(self, topic_ids: set[int], rows: np.ndarray, tz_code: int) -> np.ndarray:
+        """Total score of each candidate row for a requester with these topics and timezone code."""
+        # Tag overlap score: weighted shared topics, min(shared / 5, 1.0) to normalize
+        tag_score = np.minimum(self.topic_index.weighted_overlap(topic_ids, rows) / 5.0, 1.0)
 
-            # Calculate total score
-            total_score = 0.6 * tag_score + 0.2 * time_score + 0.2 * helpfulness_score
+        # Time overlap: shared part of the local awake window
+        time_score = self.topic_index.timezones.overlap[tz_code, self.topic_index.tz_codes[rows]]
 
-            if total_score > best_score:
-                best_score = total_score
-                best_candidate = candidate_id
+        # Helpfulness score: precomputed reputation (ratings, tips, reports), see core.reputation
+        helpfulness_score = self.topic_index.helpfulness[rows]
 
-        return best_candidate
+        # Calculate total score
+        return 0.6 * tag_score + 0.2 * time_score + 0.2 * helpfulness_score
 
 
 async def main() -> None:
     """Run match worker."""
+    if settings.match_metrics_port:
+        # The worker has no HTTP app, so expose its metrics on a dedicated port
+        start_http_server(settings.match_metrics_port)
     worker = MatchWorker()
     try:
         await worker.start()
@@ -1,6 +1,8 @@
 """Notification service for sending messages to users via Telegram bot."""
 
+import asyncio
 import logging
+from typing import Any
 
 from aiogram import Bot
 from sqlalchemy import select
@@ -8,6 +10,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from apps.bot.keyboards.inline import get_match_confirmation_keyboard
 from core.config import settings
+from core.rate_governor import Priority, rate_governor
+from core.user_loader import user_loader
 from models import User
 
 logger = logging.getLogger(__name__)
@@ -19,6 +23,19 @@ class Notifier:
     def __init__(self) -> None:
         self.bot = Bot(token=settings.telegram_bot_token)
 
+    async def _send(self, chat_id: int, text: str, priority: Priority, **kwargs: Any) -> bool:
+        """
+        Send a message within the shared Telegram rate budget.
+
+        Returns:
+            False if no send slot was granted (message skipped)
+        """
+        if not await rate_governor.acquire(chat_id, priority):
+            logger.warning(f"[NOTIFIER] Rate limited, skipping {priority.name} message to chat_id={chat_id}")
+            return False
+        await self.bot.send_message(chat_id=chat_id, text=text, **kwargs)
+        return True
+
     async def send_match_proposal(self, db: AsyncSession, match_id: int, user_id: int, partner_id: int) -> bool:
         """
         Send match proposal notification to a user.
@@ -36,14 +53,10 @@ class Notifier:
             f"[NOTIFIER] Starting send_match_proposal: match_id={match_id}, user_id={user_id}, partner_id={partner_id}"
         )
         try:
-            # Get user and partner info
-            logger.info(f"[NOTIFIER] Fetching user {user_id} from database...")
-            user_result = await db.execute(select(User).where(User.id == user_id))
-            user = user_result.scalar_one_or_none()
-
-            logger.info(f"[NOTIFIER] Fetching partner {partner_id} from database...")
-            partner_result = await db.execute(select(User).where(User.id == partner_id))
-            partner = partner_result.scalar_one_or_none()
+            # Get user and partner info (one query, or none if already loaded for this session)
+            users = await user_loader(db).load_many([user_id, partner_id])
+            user = users.get(user_id)
+            partner = users.get(partner_id)
 
             if not user or not partner:
                 logger.error(f"[NOTIFIER] User or partner not found: user={user_id}, partner={partner_id}")
@@ -64,9 +77,10 @@ class Notifier:
             """.strip()
 
             logger.info(f"[NOTIFIER] Sending message to chat_id={user.tg_id}...")
-            await self.bot.send_message(
-                chat_id=user.tg_id, text=text, reply_markup=get_match_confirmation_keyboard(match_id, user_id)
-            )
+            if not await self._send(
+                user.tg_id, text, Priority.NORMAL, reply_markup=get_match_confirmation_keyboard(match_id, user_id)
+            ):
+                return False
 
             logger.info(f"[NOTIFIER] ✅ Successfully sent match proposal to user {user_id} (tg_id={user.tg_id})")
             return True
@@ -88,12 +102,10 @@ class Notifier:
             True if sent successfully
         """
         try:
-            # Get user info
-            user_result = await db.execute(select(User).where(User.id == user_id))
-            user = user_result.scalar_one_or_none()
-
-            partner_result = await db.execute(select(User).where(User.id == partner_id))
-            partner = partner_result.scalar_one_or_none()
+            # Get user and partner info
+            users = await user_loader(db).load_many([user_id, partner_id])
+            user = users.get(user_id)
+            partner = users.get(partner_id)
 
             if not user or not partner:
                 logger.error(f"User or partner not found: user={user_id}, partner={partner_id}")
@@ -122,9 +134,8 @@ class Notifier:
 Для завершения диалога используйте команду /end
             """.strip()
 
-            await self.bot.send_message(chat_id=user.tg_id, text=intro_text)
-
-            return True
+            # Intros are the first thing to slow down under load
+            return await self._send(user.tg_id, intro_text, Priority.BULK)
 
         except Exception as e:
             logger.error(f"Failed to send match active notification to user {user_id}: {e}")
@@ -143,8 +154,7 @@ class Notifier:
         """
         try:
             # Get user info
-            user_result = await db.execute(select(User).where(User.id == user_id))
-            user = user_result.scalar_one_or_none()
+            user = await user_loader(db).get(user_id)
 
             if not user:
                 logger.error(f"User not found: {user_id}")
@@ -152,14 +162,45 @@ class Notifier:
 
             text = "😔 Собеседник отклонил предложение.\n\nПродолжаю поиск для вас..."
 
-            await self.bot.send_message(chat_id=user.tg_id, text=text)
-
-            return True
+            return await self._send(user.tg_id, text, Priority.NORMAL)
 
         except Exception as e:
             logger.error(f"Failed to send match declined notification to user {user_id}: {e}")
             return False
 
+    async def send_match_expired(self, db: AsyncSession, user_ids: list[int]) -> int:
+        """
+        Tell users their proposal expired and the search continues.
+
+        Recipients are loaded with a single query and messages are sent
+        concurrently (bounded by match_notify_concurrency).
+
+        Args:
+            db: Database session
+            user_ids: Users receiving the notification
+
+        Returns:
+            Number of messages sent successfully
+        """
+        if not user_ids:
+            return 0
+
+        result = await db.execute(select(User.id, User.tg_id).where(User.id.in_(user_ids)))
+        tg_ids = dict(result.all())
+        text = "⌛ Время на ответ истекло.\n\nПродолжаю поиск для вас..."
+        slots = asyncio.Semaphore(settings.match_notify_concurrency)
+
+        async def send(user_id: int, tg_id: int) -> bool:
+            async with slots:
+                try:
+                    return await self._send(tg_id, text, Priority.BULK)
+                except Exception as e:
+                    logger.error(f"Failed to send match expired notification to user {user_id}: {e}")
+                    return False
+
+        sent = await asyncio.gather(*(send(user_id, tg_id) for user_id, tg_id in tg_ids.items()))
+        return sum(sent)
+
     async def close(self) -> None:
         """Close bot session."""
         await self.bot.session.close()
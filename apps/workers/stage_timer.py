@@ -0,0 +1,41 @@
+"""Per-stage timing for the match pipeline."""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from core.metrics import match_stage_duration_seconds
+
+
+class StageTimer:
+    """
+    Record how long each pipeline stage takes.
+
+    Every measurement goes to match_stage_duration_seconds; totals are also
+    kept per batch so the worker can log one summary line per batch.
+    """
+
+    def __init__(self) -> None:
+        self.totals: dict[str, float] = {}
+
+    def reset(self) -> None:
+        """Start a new batch."""
+        self.totals = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as one occurrence of a stage."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record a duration measured elsewhere."""
+        match_stage_duration_seconds.labels(stage=name).observe(seconds)
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+
+    def summary(self) -> str:
+        """Batch totals as `stage=12.3ms` pairs."""
+        return " ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.totals.items())
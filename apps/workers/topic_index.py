@@ -0,0 +1,227 @@
+"""In-memory topic index for candidate search and scoring."""
+
+import logging
+
+import numpy as np
+from sqlalchemy import select
+
+from apps.workers.tz_table import TimezoneTable
+from core.db import AsyncSessionLocal
+from core.redis import listen_channel
+from core.reputation import NEUTRAL_SCORE, REPUTATION_CHANNEL
+from core.user_topics import USER_TOPICS_CHANNEL
+from models.reputation import UserReputation
+from models.topic import UserTopic
+from models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Topic sets are stored as one uint64 bitmask per user
+MAX_TOPICS = 64
+
+
+class TopicIndex:
+    """
+    Worker-resident topic index.
+
+    Every user occupies one row: a uint64 bitmask of their topics, a
+    per-topic weight vector (UserTopic.weight), a timezone code into
+    `timezones` and the precomputed helpfulness score from user_reputation. Candidate generation and overlap scoring are single NumPy
+    passes over these arrays.
+
+    Loaded once from user_topics and kept fresh incrementally via
+    USER_TOPICS_CHANNEL notifications and the topics carried by each
+    match.find request; scores follow REPUTATION_CHANNEL.
+    """
+
+    def __init__(self) -> None:
+        self.by_user: dict[int, dict[int, int]] = {}  # user_id -> {topic_id: weight}
+        self.topic_bits: dict[int, int] = {}  # topic_id -> bit position
+        self.rows: dict[int, int] = {}  # user_id -> row
+        self.free_rows: list[int] = []
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.masks = np.zeros(0, dtype=np.uint64)
+        self.weights = np.zeros((0, MAX_TOPICS), dtype=np.uint8)
+        self.timezones = TimezoneTable()
+        self.unknown_tz = self.timezones.code_of("")
+        self.tz_codes = np.zeros(0, dtype=np.int32)
+        self.reputation: dict[int, float] = {}  # user_id -> helpfulness score (missing = neutral)
+        self.helpfulness = np.zeros(0, dtype=np.float64)
+        self.loaded = False
+
+    async def load(self) -> None:
+        """(Re)build the whole index from user_topics and user_reputation."""
+        by_user: dict[int, dict[int, int]] = {}
+        tz_by_user: dict[int, str] = {}
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(UserTopic.user_id, UserTopic.topic_id, UserTopic.weight, User.tz).join(
+                    User, User.id == UserTopic.user_id
+                )
+            )
+            for user_id, topic_id, weight, tz in result.all():
+                by_user.setdefault(user_id, {})[topic_id] = weight
+                tz_by_user[user_id] = tz
+            reputation_result = await db.execute(select(UserReputation.user_id, UserReputation.score))
+            reputation = dict(reputation_result.all())
+
+        self.reputation = reputation
+        self.by_user = {}
+        self.rows = {}
+        self.free_rows = []
+        self.ids = np.zeros(len(by_user), dtype=np.int64)
+        self.masks = np.zeros(len(by_user), dtype=np.uint64)
+        self.weights = np.zeros((len(by_user), MAX_TOPICS), dtype=np.uint8)
+        self.tz_codes = np.full(len(by_user), self.unknown_tz, dtype=np.int32)
+        self.helpfulness = np.full(len(by_user), NEUTRAL_SCORE, dtype=np.float64)
+        for row, (user_id, topic_weights) in enumerate(by_user.items()):
+            self.rows[user_id] = row
+            self._write_row(row, user_id, topic_weights, tz_by_user[user_id])
+
+        self.loaded = True
+        logger.info(f"[TOPIC_INDEX] Loaded {len(by_user)} users across {len(self.topic_bits)} topics")
+
+    async def refresh_user(self, user_id: int) -> None:
+        """Reload a single user's topics from the database."""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(UserTopic.topic_id, UserTopic.weight).where(UserTopic.user_id == user_id))
+            topic_weights = dict(result.all())
+            tz_result = await db.execute(select(User.tz).where(User.id == user_id))
+            self.set_user(user_id, topic_weights, tz_result.scalar_one_or_none())
+
+    def set_user(self, user_id: int, topic_weights: dict[int, int], tz: str | None = None) -> None:
+        """Replace a user's topics (topic_id -> weight) and, if given, timezone in the index."""
+        row = self.rows.get(user_id)
+        if not topic_weights:
+            if row is not None:
+                self._clear_row(row)
+                del self.rows[user_id]
+                self.free_rows.append(row)
+            self.by_user.pop(user_id, None)
+            return
+
+        if row is None:
+            row = self._allocate_row()
+            self.rows[user_id] = row
+        self._write_row(row, user_id, topic_weights, tz)
+
+    def set_user_topics(self, user_id: int, topic_ids: set[int], tz: str | None = None) -> None:
+        """Replace a user's topic set, keeping known weights and defaulting new topics to 1."""
+        known = self.by_user.get(user_id, {})
+        self.set_user(user_id, {topic_id: known.get(topic_id, 1) for topic_id in topic_ids}, tz)
+
+    def set_scores(self, scores: dict[int, float]) -> None:
+        """Update helpfulness scores (user_id -> score) of indexed and future rows."""
+        self.reputation.update(scores)
+        for user_id, score in scores.items():
+            row = self.rows.get(user_id)
+            if row is not None:
+                self.helpfulness[row] = score
+
+    def topics_of(self, user_id: int) -> set[int]:
+        """Return indexed topic IDs of a user."""
+        return set(self.by_user.get(user_id, {}))
+
+    def mask_of(self, topic_ids: set[int]) -> np.uint64:
+        """Build the bitmask for a set of topic IDs."""
+        mask = 0
+        for topic_id in topic_ids:
+            mask |= 1 << self._bit(topic_id)
+        return np.uint64(mask)
+
+    def candidates(self, user_id: int, topic_ids: set[int], min_shared: int = 2) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find users sharing at least min_shared of the given topics.
+
+        Returns:
+            (candidate user IDs, their row numbers) as aligned int64 arrays
+        """
+        shared = np.bitwise_count(self.masks & self.mask_of(topic_ids))
+        rows = np.flatnonzero(shared >= min_shared)
+        rows = rows[self.ids[rows] != user_id]
+        return self.ids[rows], rows
+
+    def weighted_overlap(self, topic_ids: set[int], rows: np.ndarray) -> np.ndarray:
+        """Sum candidate weights over the shared topics for each row."""
+        bits = [self._bit(topic_id) for topic_id in topic_ids]
+        return self.weights[np.ix_(rows, bits)].sum(axis=1, dtype=np.float64)
+
+    def pairwise_overlap(self, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Compute overlap between every pair of the given rows.
+
+        Returns:
+            (shared topic counts, weighted overlap) as (n, n) arrays; weighted[i, j]
+            sums row j's weights over row i's topics
+        """
+        masks = self.masks[rows]
+        shared = np.bitwise_count(masks[:, None] & masks[None, :])
+        bits = ((masks[:, None] >> np.arange(MAX_TOPICS, dtype=np.uint64)) & np.uint64(1)).astype(np.float64)
+        weighted = bits @ self.weights[rows].T.astype(np.float64)
+        return shared, weighted
+
+    def _bit(self, topic_id: int) -> int:
+        bit = self.topic_bits.get(topic_id)
+        if bit is None:
+            if len(self.topic_bits) >= MAX_TOPICS:
+                raise ValueError(f"Topic index supports at most {MAX_TOPICS} topics")
+            bit = self.topic_bits[topic_id] = len(self.topic_bits)
+        return bit
+
+    def _allocate_row(self) -> int:
+        if self.free_rows:
+            return self.free_rows.pop()
+        row = len(self.rows)
+        if row >= self.ids.size:
+            # Grow geometrically so incremental inserts stay amortised O(1)
+            capacity = max(16, self.ids.size * 2)
+            self.ids = np.resize(self.ids, capacity)
+            self.masks = np.resize(self.masks, capacity)
+            self.weights = np.resize(self.weights, (capacity, MAX_TOPICS))
+            self.tz_codes = np.resize(self.tz_codes, capacity)
+            self.helpfulness = np.resize(self.helpfulness, capacity)
+            self.ids[row:] = 0
+            self.masks[row:] = 0
+            self.weights[row:] = 0
+            self.tz_codes[row:] = self.unknown_tz
+            self.helpfulness[row:] = NEUTRAL_SCORE
+        return row
+
+    def _write_row(self, row: int, user_id: int, topic_weights: dict[int, int], tz: str | None) -> None:
+        self.by_user[user_id] = dict(topic_weights)
+        if tz is not None:
+            self.tz_codes[row] = self.timezones.code_of(tz)
+        self.ids[row] = user_id
+        self.helpfulness[row] = self.reputation.get(user_id, NEUTRAL_SCORE)
+        self.masks[row] = self.mask_of(set(topic_weights))
+        self.weights[row] = 0
+        for topic_id, weight in topic_weights.items():
+            self.weights[row, self._bit(topic_id)] = min(max(weight, 0), 255)
+
+    def _clear_row(self, row: int) -> None:
+        self.ids[row] = 0
+        self.masks[row] = 0
+        self.weights[row] = 0
+        self.tz_codes[row] = self.unknown_tz
+        self.helpfulness[row] = NEUTRAL_SCORE
+
+    async def listen(self) -> None:
+        """Apply USER_TOPICS_CHANNEL notifications until cancelled."""
+        await listen_channel(USER_TOPICS_CHANNEL, lambda data: self.refresh_user(int(data)), self.load)
+
+    async def reload_scores(self) -> None:
+        """Re-read every helpfulness score from user_reputation."""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(UserReputation.user_id, UserReputation.score))
+            self.set_scores(dict(result.all()))
+
+    async def _apply_scores(self, data: str) -> None:
+        scores = {}
+        for pair in data.split(","):
+            user_id, score = pair.split(":")
+            scores[int(user_id)] = float(score)
+        self.set_scores(scores)
+
+    async def listen_reputation(self) -> None:
+        """Apply REPUTATION_CHANNEL notifications until cancelled."""
+        await listen_channel(REPUTATION_CHANNEL, self._apply_scores, self.reload_scores)
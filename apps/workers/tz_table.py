@@ -0,0 +1,65 @@
+"""Precomputed timezone compatibility table for matching."""
+
+import logging
+from datetime import datetime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Users are compatible when their UTC offsets differ by at most this many hours
+MAX_TZ_DIFF_HOURS = 3.0
+
+# Length of the local "awake" window used for the time-overlap score
+ACTIVE_HOURS = 14.0
+
+# Score used when a timezone name cannot be resolved
+UNKNOWN_TIME_SCORE = 0.5
+
+
+class TimezoneTable:
+    """
+    Small table of distinct timezone names with their current UTC offsets.
+
+    Each name gets an integer code; compatibility (±3h) and time-overlap
+    scores between every pair of codes are precomputed, so per-candidate
+    checks are array lookups. refresh() recomputes offsets after DST changes.
+    """
+
+    def __init__(self) -> None:
+        self.codes: dict[str, int] = {}
+        self.names: list[str] = []
+        self.offsets = np.zeros(0, dtype=np.float64)  # hours from UTC, NaN if unknown
+        self.compatible = np.zeros((0, 0), dtype=bool)
+        self.overlap = np.zeros((0, 0), dtype=np.float64)
+
+    def code_of(self, tz: str) -> int:
+        """Return the code for a timezone name, registering it if new."""
+        code = self.codes.get(tz)
+        if code is None:
+            code = self.codes[tz] = len(self.names)
+            self.names.append(tz)
+            self.refresh()
+        return code
+
+    def refresh(self) -> None:
+        """Recompute offsets for the current moment and rebuild the pair tables."""
+        now = datetime.utcnow()
+        offsets = np.full(len(self.names), np.nan)
+        for code, name in enumerate(self.names):
+            try:
+                offset = ZoneInfo(name).utcoffset(now)
+            except (ZoneInfoNotFoundError, ValueError):
+                continue
+            if offset is not None:
+                offsets[code] = offset.total_seconds() / 3600
+
+        diff = np.abs(offsets[:, None] - offsets[None, :])
+        diff = np.minimum(diff, 24 - diff)  # Offsets wrap around the date line
+        unknown = np.isnan(diff)
+
+        self.offsets = offsets
+        self.compatible = unknown | (diff <= MAX_TZ_DIFF_HOURS)
+        self.overlap = np.where(unknown, UNKNOWN_TIME_SCORE, np.clip((ACTIVE_HOURS - diff) / ACTIVE_HOURS, 0.0, 1.0))
+        logger.info(f"[TZ_TABLE] Refreshed offsets for {len(self.names)} timezones")
@@ -21,6 +21,63 @@ class Settings(BaseSettings):
 
     # Bot
     bot_port: int = 8080
+    bot_relay_fast_path: bool = True  # Relay chat messages from the Redis route cache without calling the API
+    bot_outbound_concurrency: int = 30  # Relayed messages being sent at once (across all chats)
+    bot_outbound_max_per_chat: int = 200  # Queued messages per destination chat before new ones are dropped
+    bot_outbound_max_attempts: int = 5  # Send attempts per message (429s and transient errors)
+    bot_outbound_retry_base_s: float = 1.0  # Backoff before retrying a transient error; doubles per attempt
+
+    # Telegram rate governor (shared by every process sending as the bot)
+    telegram_rate_global_per_s: float = 25.0  # Bot-wide messages per second (Telegram allows ~30)
+    telegram_rate_global_burst: int = 30
+    telegram_rate_chat_per_s: float = 1.0  # Messages per second to one chat
+    telegram_rate_chat_burst: int = 3
+    telegram_rate_reserve_normal: int = 3  # Global tokens NORMAL-priority sends leave for user messages
+    telegram_rate_reserve_bulk: int = 10  # Global tokens BULK-priority sends (intros, expiry notices) leave
+    telegram_rate_max_wait_s: float = 30.0  # Give up on a send slot after this long
+
+    # Match worker
+    match_batch_size: int = 10  # Max entries read from match.find per XREADGROUP
+    match_block_ms: int = 5000  # XREADGROUP block timeout in milliseconds
+    match_consumer_name: str = ""  # Stream consumer name; empty = derived from hostname and PID
+    match_claim_interval_s: int = 30  # How often to reclaim stale pending entries
+    match_claim_idle_ms: int = 60000  # Pending entries idle longer than this are claimed from dead consumers
+    match_consumer_idle_ms: int = 3600000  # Consumers idle this long with no pending entries are removed
+    match_topic_index_refresh_s: int = 600  # Full rebuild interval for the in-memory topic index
+    match_wait_ttl_s: int = 900  # Searchers drop out of the waiting pool after this long
+    match_contacts_cache_ttl_s: int = 3600  # Max age of a cached recent-contact exclusion list
+    match_tz_refresh_s: int = 3600  # Recompute timezone offsets (DST) this often
+    match_pool_mode: bool = False  # Pool requests per tick and pair them globally instead of greedily
+    match_pool_tick_ms: int = 1500  # How long requests are collected before the pool is solved
+    # Pools are solved off the event loop; exact matching is ~O(n³) (up to ~0.8s at 100 users, ~1 min at 500),
+    # so larger pools are paired greedily. Keep solves well below match_claim_idle_ms.
+    match_pool_max_size: int = 100  # Solve early once this many requests are pooled
+    match_pool_exact_max: int = 100  # Largest pool paired with exact max-weight matching; larger ones use greedy
+    match_pool_exact_max_edges: int = 5000  # Same, by eligible pairs (~0.8s at 100 users with all pairs eligible)
+    match_shards: int = 1  # Number of match.find.{shard} streams; 1 = single match.find stream
+    match_worker_shards: str = ""  # Comma-separated shards this worker owns; empty = all
+    match_shard_fallback_s: int = 30  # Take over entries left waiting this long on shards owned by others
+    match_notify_concurrency: int = 20  # Telegram sends in flight at once from the match worker
+    match_notify_max_pending: int = 500  # Backlog of queued notifications before matching pauses
+    match_expiry_sweep_interval_s: int = 30  # How often expired proposals are swept
+    match_expiry_sweep_batch: int = 500  # Matches expired per UPDATE
+    match_retry_max_attempts: int = 5  # Failed entries are dead-lettered after this many attempts
+    match_retry_base_s: float = 2.0  # Backoff before the first retry; doubles per attempt
+    match_retry_max_s: float = 300.0  # Backoff cap
+    match_metrics_port: int = 9101  # Prometheus exporter port of the match worker; 0 disables it
+    match_metrics_interval_s: int = 10  # How often queue size and lag are sampled
+    # match.find entry format written by the API: 1 = legacy string fields, 2 = packed.
+    # Switch to 2 only after every worker has been upgraded to decode packed entries.
+    match_payload_version: int = 1
+
+    # Topic catalog
+    topic_catalog_check_s: int = 30  # How often processes check the catalog version in Redis (reload if it is unset)
+
+    # Chat relay
+    relay_route_ttl_s: int = 86400  # Cached relay routes of idle chats expire after this long
+    relay_route_ended_ttl_s: int = 60  # Ended chats can't be re-cached from reads this old; must exceed a relay request
+    chat_counter_flush_interval_s: int = 5  # How often buffered message counts are written to chat_sessions
+    chat_counter_flush_stale_s: int = 300  # Flushes unfinished after this long (crashed process) are merged back
 
     # AI Coach
     ai_enabled: bool = False
@@ -0,0 +1,121 @@
+"""Retry scheduling and dead-letter records for match.find entries."""
+
+import json
+import time
+from datetime import datetime
+from typing import Any
+
+from core.config import settings
+from core.match_payload import payload_user_id
+from core.match_streams import DEAD_STREAM, FIND_STREAM, all_find_streams
+from core.redis import get_redis
+from core.waiting_pool import search_key
+
+# Sorted set of entries waiting to be retried, scored by due time (unix seconds)
+RETRY_KEY = "match.retry"
+
+# Fields added to a failed entry; everything else is the original payload
+FAILURE_FIELDS = ("dlq_error", "dlq_message", "dlq_attempts", "dlq_failed_at", "dlq_stream")
+
+
+def attempts_of(message_data: dict[str, str]) -> int:
+    """Number of failed attempts recorded on an entry so far."""
+    try:
+        return int(message_data.get("dlq_attempts", 0))
+    except ValueError:
+        return 0
+
+
+def failure_record(message_data: dict[str, str], error: BaseException, stream: str) -> dict[str, str]:
+    """
+    Annotate an entry with the error that failed it.
+
+    Args:
+        message_data: Original stream entry fields
+        error: Exception raised while processing
+        stream: Stream the entry was read from
+
+    Returns:
+        Payload plus dlq_* fields, with the attempt counter incremented
+    """
+    return {
+        **original_payload(message_data),
+        "dlq_error": type(error).__name__,
+        "dlq_message": str(error)[:500],
+        "dlq_attempts": str(attempts_of(message_data) + 1),
+        "dlq_failed_at": datetime.utcnow().isoformat(),
+        "dlq_stream": stream,
+    }
+
+
+def original_payload(message_data: dict[str, str]) -> dict[str, str]:
+    """Strip dlq_* fields from an entry."""
+    return {key: value for key, value in message_data.items() if key not in FAILURE_FIELDS}
+
+
+def retry_delay_s(attempts: int) -> float:
+    """Exponential backoff before the next attempt: base * 2^(attempts-1), capped."""
+    return min(settings.match_retry_base_s * 2 ** max(attempts - 1, 0), settings.match_retry_max_s)
+
+
+def schedule_failure(pipe: Any, record: dict[str, str], retryable: bool = True) -> bool:
+    """
+    Queue a failed entry for retry, or dead-letter it once attempts run out.
+
+    Args:
+        pipe: Redis pipeline the commands are added to
+        record: Output of failure_record
+        retryable: False for entries that can never succeed (e.g. undecodable)
+
+    Returns:
+        True if the entry was scheduled for retry
+    """
+    attempts = attempts_of(record)
+    if retryable and attempts < settings.match_retry_max_attempts:
+        pipe.zadd(RETRY_KEY, {json.dumps(record, sort_keys=True): time.time() + retry_delay_s(attempts)})
+        return True
+    pipe.xadd(DEAD_STREAM, record)
+    return False
+
+
+def replay_stream(record: dict[str, str]) -> str:
+    """Stream a failed entry goes back to; falls back to shard 0 if its stream no longer exists."""
+    streams = all_find_streams()
+    stream = record.get("dlq_stream", FIND_STREAM)
+    return stream if stream in streams else streams[0]
+
+
+async def requeue_due_retries(limit: int = 100) -> int:
+    """
+    Move retries whose backoff has elapsed back to their match.find stream.
+
+    Members are removed with ZREM first so that, with several workers, each
+    retry is re-added exactly once. The user's search reservation is pointed
+    at the new entry, so the worker releases it once the retry is processed.
+
+    Returns:
+        Number of entries re-added
+    """
+    redis = await get_redis()
+    due = await redis.zrangebyscore(RETRY_KEY, "-inf", time.time(), start=0, num=limit)
+    if not due:
+        return 0
+
+    pipe = redis.pipeline(transaction=False)
+    for member in due:
+        pipe.zrem(RETRY_KEY, member)
+    removed = await pipe.execute()
+
+    records = [json.loads(member) for member, was_removed in zip(due, removed, strict=True) if was_removed]
+    pipe = redis.pipeline(transaction=False)
+    for record in records:
+        pipe.xadd(replay_stream(record), record)
+    requeued = await pipe.execute()
+
+    pipe = redis.pipeline(transaction=False)
+    for record, stream_id in zip(records, requeued, strict=True):
+        user_id = payload_user_id(record)
+        if user_id is not None:
+            pipe.set(search_key(user_id), stream_id, xx=True, keepttl=True)
+    await pipe.execute()
+    return len(requeued)
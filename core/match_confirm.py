@@ -0,0 +1,112 @@
+"""Single-statement state transitions for match confirmation."""
+
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import case, or_, select, true, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.chat import ChatSession
+from models.match import Match
+
+
+@dataclass
+class ConfirmResult:
+    """Outcome of an accept/decline applied to a proposed match."""
+
+    user_a: int
+    user_b: int
+    status: str  # "proposed" (waiting for the other side), "active" or "declined"
+
+
+async def apply_confirmation(db: AsyncSession, match_id: int, user_id: int, accepted: bool) -> ConfirmResult | None:
+    """
+    Record a participant's answer and derive the new match status in one UPDATE.
+
+    The UPDATE row lock serialises concurrent answers to the same match: the
+    second one re-evaluates against the committed acceptance of the first, so
+    exactly one of two simultaneous accepts sees both flags set and activates.
+    Nothing is committed here.
+
+    Args:
+        db: Database session
+        match_id: Match being answered
+        user_id: Internal ID of the answering user
+        accepted: True to accept, False to decline
+
+    Returns:
+        New state, or None if the match is not an open, unexpired proposal of this user
+    """
+    is_a = Match.user_a == user_id
+    other_accepted = case((is_a, Match.user_b_accepted), else_=Match.user_a_accepted)
+    status = case((other_accepted.is_(True), "active"), else_="proposed") if accepted else "declined"
+
+    result = await db.execute(
+        update(Match)
+        .where(
+            Match.id == match_id,
+            Match.status == "proposed",
+            or_(Match.expires_at.is_(None), Match.expires_at >= datetime.utcnow()),
+            or_(Match.user_a == user_id, Match.user_b == user_id),
+        )
+        .values(
+            user_a_accepted=case((is_a, accepted), else_=Match.user_a_accepted),
+            user_b_accepted=case((is_a, Match.user_b_accepted), else_=accepted),
+            status=status,
+        )
+        .returning(Match.user_a, Match.user_b, Match.status)
+        .execution_options(synchronize_session=False)
+    )
+    row = result.first()
+    return ConfirmResult(*row) if row else None
+
+
+async def start_chat_session(
+    db: AsyncSession, match_id: int, user_a: int, user_b: int
+) -> tuple[int, set[int], set[int]]:
+    """
+    Close both users' other active chats and open the session of this match, in one statement.
+
+    Other active matches of either user become `completed` and their open
+    sessions are ended (data-modifying CTEs), then the new session is
+    inserted. Nothing is committed here.
+
+    Returns:
+        (ID of the new chat session, former chat partners whose chats were closed,
+        IDs of the ended sessions, whose buffered message counts still need flushing)
+    """
+    now = datetime.utcnow()
+    pair = (user_a, user_b)
+    closed_matches = (
+        update(Match)
+        .where(
+            Match.status == "active",
+            Match.id != match_id,
+            or_(Match.user_a.in_(pair), Match.user_b.in_(pair)),
+        )
+        .values(status="completed")
+        .returning(Match.id, Match.user_a, Match.user_b)
+        .cte("closed_matches")
+    )
+    ended_sessions = (
+        update(ChatSession)
+        .where(ChatSession.ended_at.is_(None), ChatSession.match_id.in_(select(closed_matches.c.id)))
+        .values(ended_at=now)
+        .returning(ChatSession.id, ChatSession.match_id)
+        .cte("ended_sessions")
+    )
+    new_session = (
+        insert(ChatSession).values(match_id=match_id, started_at=now).returning(ChatSession.id).cte("new_session")
+    )
+    result = await db.execute(
+        select(new_session.c.id, ended_sessions.c.id, closed_matches.c.user_a, closed_matches.c.user_b).select_from(
+            new_session.outerjoin(closed_matches, true()).outerjoin(
+                ended_sessions, ended_sessions.c.match_id == closed_matches.c.id
+            )
+        )
+    )
+    rows = result.all()
+    closed_users = {user_id for *_, user_a, user_b in rows for user_id in (user_a, user_b) if user_id is not None}
+    ended_ids = {ended_id for _, ended_id, *_ in rows if ended_id is not None}
+    return rows[0][0], closed_users - set(pair), ended_ids
@@ -0,0 +1,81 @@
+"""Encoding of match.find stream entries."""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+# Field holding a packed v2 entry
+PACKED_FIELD = "m"
+
+# Current packed format version
+PAYLOAD_VERSION = 2
+
+
+@dataclass
+class MatchRequest:
+    """Single match.find entry decoded from the stream."""
+
+    user_id: int
+    topics: list[str]  # topic slugs (v1 entries only)
+    timezone: str
+    topic_ids: set[int] | None = None  # topic IDs (v2 entries); None = resolve `topics`
+    requested_at: float | None = None  # unix seconds
+
+
+def encode_match_request(
+    user_id: int, tg_id: int, topic_ids: Iterable[int], timezone: str, requested_at: float
+) -> dict[str, str]:
+    """
+    Pack a search into a single stream field.
+
+    Format: ``2:<user_id>:<tg_id>:<topic bitmask, hex>:<requested_at, epoch ms>:<timezone>``.
+    Bit N of the mask is topic ID N, so the worker needs no slug lookups.
+    The timezone goes last because it is the only free-form part.
+
+    Returns:
+        Stream entry fields
+    """
+    mask = 0
+    for topic_id in topic_ids:
+        mask |= 1 << topic_id
+    return {
+        PACKED_FIELD: f"{PAYLOAD_VERSION}:{user_id}:{tg_id}:{mask:x}:{int(requested_at * 1000)}:{timezone}",
+    }
+
+
+def decode_match_request(message_data: dict[str, str]) -> MatchRequest:
+    """
+    Decode a stream entry in either the packed v2 or the legacy v1 format.
+
+    v1 entries (``user_id``, comma-joined ``topics`` slugs, ``timezone``) are
+    still accepted so entries queued before a rollout keep working.
+
+    Raises:
+        KeyError, ValueError: If the entry is malformed
+    """
+    packed = message_data.get(PACKED_FIELD)
+    if packed is None:
+        return MatchRequest(
+            user_id=int(message_data["user_id"]),
+            topics=message_data["topics"].split(","),
+            timezone=message_data["timezone"],
+        )
+
+    version, user_id, _, mask_hex, requested_ms, timezone = packed.split(":", 5)
+    if int(version) != PAYLOAD_VERSION:
+        raise ValueError(f"Unsupported match.find payload version {version}")
+    mask = int(mask_hex, 16)
+    return MatchRequest(
+        user_id=int(user_id),
+        topics=[],
+        timezone=timezone,
+        topic_ids={bit for bit in range(mask.bit_length()) if mask >> bit & 1},
+        requested_at=int(requested_ms) / 1000,
+    )
+
+
+def payload_user_id(message_data: dict[str, str]) -> int | None:
+    """User ID of an entry in either format, or None if it cannot be read."""
+    try:
+        return decode_match_request(message_data).user_id
+    except (KeyError, ValueError):
+        return None
@@ -0,0 +1,57 @@
+"""match.find stream names and shard routing."""
+
+import zlib
+
+from core.config import settings
+
+# Single stream used when sharding is disabled (match_shards <= 1)
+FIND_STREAM = "match.find"
+
+# Dead-letter stream for entries that could not be processed
+DEAD_STREAM = "match.dead"
+
+
+def find_stream(shard: int) -> str:
+    """Stream name for a shard."""
+    if settings.match_shards <= 1:
+        return FIND_STREAM
+    return f"{FIND_STREAM}.{shard}"
+
+
+def all_find_streams() -> list[str]:
+    """Every match.find stream in the current sharding layout."""
+    return [find_stream(shard) for shard in range(max(settings.match_shards, 1))]
+
+
+def owned_find_streams() -> list[str]:
+    """Streams this worker reads first (match_worker_shards; empty = all shards)."""
+    if not settings.match_worker_shards.strip():
+        return all_find_streams()
+    shards = {int(shard) for shard in settings.match_worker_shards.split(",") if shard.strip()}
+    owned = [find_stream(shard) for shard in sorted(shards) if shard < max(settings.match_shards, 1)]
+    # A worker configured only with out-of-range shards still has to read something
+    return owned or all_find_streams()
+
+
+def primary_topic(topic_weights: dict[int, int]) -> int:
+    """User's primary topic: highest weight, lowest topic ID on ties."""
+    return max(topic_weights, key=lambda topic_id: (topic_weights[topic_id], -topic_id))
+
+
+def stream_for_topics(topic_weights: dict[int, int]) -> str:
+    """
+    Route a search to a shard by its primary topic.
+
+    Users who lead with the same topic land on the same shard, so the
+    worker owning it sees most of their likely candidates' requests.
+
+    Args:
+        topic_weights: User's topic_id -> weight
+
+    Returns:
+        Stream name to XADD the request to
+    """
+    if settings.match_shards <= 1 or not topic_weights:
+        return FIND_STREAM
+    shard = zlib.crc32(str(primary_topic(topic_weights)).encode()) % settings.match_shards
+    return find_stream(shard)
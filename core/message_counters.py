@@ -0,0 +1,210 @@
+"""Write-behind chat message counters (chat_sessions.msg_count_a / msg_count_b)."""
+
+import logging
+import time
+from collections.abc import Iterable
+from uuid import uuid4
+
+from sqlalchemy import BigInteger, Integer, column, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.db import AsyncSessionLocal
+from core.redis import get_redis
+from models.chat import ChatSession
+
+logger = logging.getLogger(__name__)
+
+# Redis hash "{chat_session_id}:{a|b}" -> messages not yet written to chat_sessions
+COUNTS_KEY = "chat.msg_counts"
+
+# Sorted set of hashes being flushed ("chat.msg_counts:flushing:{uuid}"), scored by claim time (unix seconds)
+FLUSHING_KEY = "chat.msg_counts:flushing"
+
+# Field set on a flushing hash once its counts are about to be committed; sealed hashes can't be taken from
+SEALED_FIELD = "sealed"
+
+# Moves the pending counts (KEYS[1]) to a new flushing hash (KEYS[2]) registered in KEYS[3] at time ARGV[1].
+# Returns 0 if nothing is pending.
+_CLAIM_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('RENAME', KEYS[1], KEYS[2])
+redis.call('ZADD', KEYS[3], ARGV[1], KEYS[2])
+return 1
+"""
+
+# Removes fields ARGV from the pending counts (KEYS[1]) and from every unsealed flushing hash
+# registered in KEYS[2]. Returns the summed count of each field.
+_TAKE_SCRIPT = """
+local sources = redis.call('ZRANGE', KEYS[2], 0, -1)
+table.insert(sources, 1, KEYS[1])
+local totals = {}
+for i = 1, #ARGV do
+    totals[i] = 0
+end
+for _, key in ipairs(sources) do
+    if key == KEYS[1] or redis.call('HEXISTS', key, 'sealed') == 0 then
+        local counts = redis.call('HMGET', key, unpack(ARGV))
+        for i = 1, #ARGV do
+            totals[i] = totals[i] + (tonumber(counts[i]) or 0)
+        end
+        redis.call('HDEL', key, unpack(ARGV))
+    end
+end
+return totals
+"""
+
+# Merges flushing hashes (ARGV) back into the pending counts (KEYS[1]) and unregisters them from KEYS[2]
+_MERGE_BACK_SCRIPT = """
+for _, key in ipairs(ARGV) do
+    local counts = redis.call('HGETALL', key)
+    for i = 1, #counts, 2 do
+        if counts[i] ~= 'sealed' then
+            redis.call('HINCRBY', KEYS[1], counts[i], counts[i + 1])
+        end
+    end
+    redis.call('DEL', key)
+    redis.call('ZREM', KEYS[2], key)
+end
+return #ARGV
+"""
+
+
+def _field(chat_session_id: int, side: str) -> str:
+    return f"{chat_session_id}:{side}"
+
+
+def _parse(counts: dict[str, str]) -> dict[int, tuple[int, int]]:
+    """Hash fields -> {chat_session_id: (messages from a, messages from b)}."""
+    deltas: dict[int, list[int]] = {}
+    for field, count in counts.items():
+        if field == SEALED_FIELD:
+            continue
+        session_id, side = field.split(":")
+        deltas.setdefault(int(session_id), [0, 0])[0 if side == "a" else 1] += int(count)
+    return {session_id: (a, b) for session_id, (a, b) in deltas.items()}
+
+
+async def record_message(chat_session_id: int, side: str) -> None:
+    """Count one relayed message from side "a" or "b" of a chat."""
+    redis = await get_redis()
+    await redis.hincrby(COUNTS_KEY, _field(chat_session_id, side), 1)
+
+
+async def apply_message_counts(db: AsyncSession, deltas: dict[int, tuple[int, int]]) -> None:
+    """Add counter deltas to chat_sessions with one multi-row UPDATE (not committed)."""
+    if not deltas:
+        return
+    rows = values(column("id", BigInteger), column("a", Integer), column("b", Integer), name="deltas").data(
+        [(session_id, a, b) for session_id, (a, b) in deltas.items()]
+    )
+    await db.execute(
+        update(ChatSession)
+        .where(ChatSession.id == rows.c.id)
+        .values(msg_count_a=ChatSession.msg_count_a + rows.c.a, msg_count_b=ChatSession.msg_count_b + rows.c.b)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def take_session_counts(chat_session_ids: Iterable[int]) -> dict[int, tuple[int, int]]:
+    """
+    Remove and return pending counts of specific sessions (force flush on session end).
+
+    Counts already claimed by a flush that has not started committing are
+    taken from its hash too, so they are not left to a flush that may fail.
+
+    Returns:
+        {chat_session_id: (messages from a, messages from b)} for sessions with pending counts
+    """
+    fields = [_field(session_id, side) for session_id in chat_session_ids for side in ("a", "b")]
+    if not fields:
+        return {}
+    redis = await get_redis()
+    script = redis.register_script(_TAKE_SCRIPT)
+    counts = await script(client=redis, keys=[COUNTS_KEY, FLUSHING_KEY], args=fields)
+    return _parse({field: count for field, count in zip(fields, counts, strict=True) if int(count)})
+
+
+async def restore_session_counts(deltas: dict[int, tuple[int, int]]) -> None:
+    """Put counts taken with take_session_counts back, e.g. when writing them failed."""
+    if not deltas:
+        return
+    redis = await get_redis()
+    pipe = redis.pipeline(transaction=False)
+    for session_id, (a, b) in deltas.items():
+        for side, count in (("a", a), ("b", b)):
+            if count:
+                pipe.hincrby(COUNTS_KEY, _field(session_id, side), count)
+    await pipe.execute()
+
+
+async def flush_message_counts() -> int:
+    """
+    Write every pending count to chat_sessions in one transaction.
+
+    The hash is atomically renamed to a flushing hash first, so increments
+    arriving during the flush go to a fresh hash, and several processes can
+    flush concurrently. Before committing, the flushing hash is sealed and
+    re-read: counts taken meanwhile by take_session_counts are not written
+    twice. On failure the remaining counts are merged back for the next flush.
+
+    Returns:
+        Number of chat sessions updated
+    """
+    redis = await get_redis()
+    batch_key = f"{COUNTS_KEY}:flushing:{uuid4().hex}"
+    claim = redis.register_script(_CLAIM_SCRIPT)
+    if not await claim(client=redis, keys=[COUNTS_KEY, batch_key, FLUSHING_KEY], args=[time.time()]):
+        return 0  # Nothing pending
+
+    try:
+        async with AsyncSessionLocal() as db:
+            counts = await redis.hgetall(batch_key)
+            await apply_message_counts(db, _parse(counts))
+
+            # Seal: from here on take_session_counts leaves this hash alone
+            pipe = redis.pipeline(transaction=True)
+            pipe.hset(batch_key, SEALED_FIELD, 1)
+            pipe.hgetall(batch_key)
+            _, sealed = await pipe.execute()
+            sealed.pop(SEALED_FIELD, None)
+            if sealed != counts:
+                # Some sessions ended and took their counts meanwhile
+                await db.rollback()
+                await apply_message_counts(db, _parse(sealed))
+            await db.commit()
+    except Exception:
+        await _merge_back(batch_key)
+        raise
+
+    pipe = redis.pipeline(transaction=False)
+    pipe.delete(batch_key)
+    pipe.zrem(FLUSHING_KEY, batch_key)
+    await pipe.execute()
+    return len(_parse(sealed))
+
+
+async def recover_stale_flushes() -> int:
+    """
+    Return counts of flushes that never finished (e.g. the process died) to the pending hash.
+
+    Flushing hashes claimed more than counter_flush_stale_s ago are merged
+    back; live flushes take milliseconds, so they are never touched.
+
+    Returns:
+        Number of flushing hashes recovered
+    """
+    redis = await get_redis()
+    stale = await redis.zrangebyscore(FLUSHING_KEY, "-inf", time.time() - settings.chat_counter_flush_stale_s)
+    if stale:
+        await _merge_back(*stale)
+        logger.warning(f"[COUNTERS] Recovered {len(stale)} unfinished message count flush(es)")
+    return len(stale)
+
+
+async def _merge_back(*batch_keys: str) -> None:
+    redis = await get_redis()
+    script = redis.register_script(_MERGE_BACK_SCRIPT)
+    await script(client=redis, keys=[COUNTS_KEY, FLUSHING_KEY], args=list(batch_keys))
@@ -17,11 +17,44 @@ match_requests_total = Counter("match_requests_total", "Total number of match re
 
 matches_created_total = Counter("matches_created_total", "Total number of successful matches", ["status"])
 
+# Upper bounds of the batch_size label buckets (bounded label cardinality)
+BATCH_SIZE_BUCKETS = (1, 10, 50, 100, 500)
+
+match_batch_duration_seconds = Histogram(
+    "match_batch_duration_seconds", "Time to process one match.find batch", ["batch_size"]
+)
+
+match_batch_throughput = Gauge(
+    "match_batch_throughput", "Match requests processed per second in the last batch", ["batch_size"]
+)
+
+
+def batch_size_label(size: int) -> str:
+    """Coarse batch_size label: "1", "2-10", "11-50", ..., ">500"."""
+    lower = 1
+    for upper in BATCH_SIZE_BUCKETS:
+        if size <= upper:
+            return str(upper) if lower == upper else f"{lower}-{upper}"
+        lower = upper + 1
+    return f">{BATCH_SIZE_BUCKETS[-1]}"
+
+
+match_stage_duration_seconds = Histogram(
+    "match_stage_duration_seconds",
+    "Time spent in each match pipeline stage (dequeue = time an entry waited in the stream)",
+    ["stage"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+
+match_worker_lag_ms = Gauge(
+    "match_worker_lag_ms", "Age of the oldest unacknowledged match.find entry in milliseconds", ["stream"]
+)
+
 # Active users
 active_users = Gauge("active_users", "Number of active users in the system")
 
 # Queue metrics
-match_queue_size = Gauge("match_queue_size", "Current size of match queue")
+match_queue_size = Gauge("match_queue_size", "Current size of match queue (undelivered + pending entries)")
 
 # Response time metrics
 api_request_duration = Histogram(
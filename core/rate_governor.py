@@ -0,0 +1,140 @@
+"""Cross-process Telegram send rate governor (Redis token buckets)."""
+
+import asyncio
+import logging
+import random
+import time
+from enum import IntEnum
+
+from redis.commands.core import AsyncScript
+
+from core.config import settings
+from core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Token bucket keys: one bot-wide, one per destination chat
+GLOBAL_BUCKET_KEY = "tg.rate:global"
+
+
+def chat_bucket_key(chat_id: int) -> str:
+    """Redis key of a chat's token bucket."""
+    return f"tg.rate:chat:{chat_id}"
+
+
+class Priority(IntEnum):
+    """Send priority; lower-priority sends leave part of the global budget to higher ones."""
+
+    USER = 0  # Relayed chat messages
+    NORMAL = 1  # Match proposals, declines, tips
+    BULK = 2  # Intros, expiry notices
+
+
+# Takes one token from the global bucket (KEYS[1]) and one from the chat bucket
+# (KEYS[2]) atomically, or neither. The global bucket must keep ARGV[5] tokens in
+# reserve for higher priorities. Returns 0 on success, else milliseconds to wait.
+_ACQUIRE_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local function level(key, rate, burst)
+    local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or burst
+    local ts = tonumber(bucket[2]) or now
+    return math.min(burst, tokens + math.max(0, now - ts) * rate / 1000)
+end
+
+local global_rate, global_burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+local chat_rate, chat_burst = tonumber(ARGV[3]), tonumber(ARGV[4])
+local reserve = tonumber(ARGV[5])
+
+local global_tokens = level(KEYS[1], global_rate, global_burst)
+local chat_tokens = level(KEYS[2], chat_rate, chat_burst)
+
+local wait = 0
+if global_tokens < 1 + reserve then
+    wait = math.max(wait, (1 + reserve - global_tokens) * 1000 / global_rate)
+end
+if chat_tokens < 1 then
+    wait = math.max(wait, (1 - chat_tokens) * 1000 / chat_rate)
+end
+if wait > 0 then
+    return math.ceil(wait)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', global_tokens - 1, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(global_burst * 1000 / global_rate) + 1000)
+redis.call('HSET', KEYS[2], 'tokens', chat_tokens - 1, 'ts', now)
+redis.call('PEXPIRE', KEYS[2], math.ceil(chat_burst * 1000 / chat_rate) + 1000)
+return 0
+"""
+
+
+class RateGovernor:
+    """
+    Token-bucket limiter for outgoing Telegram messages, shared via Redis.
+
+    Every process sending as the bot (bot, API, match worker) draws from the
+    same global bucket (telegram_rate_global_per_s) and per-chat buckets
+    (telegram_rate_chat_per_s), so the combined traffic stays within
+    Telegram's limits. NORMAL and BULK sends must leave a reserve of global
+    tokens, so under load they queue up first and user messages keep flowing.
+    """
+
+    def __init__(self) -> None:
+        self._script: AsyncScript | None = None
+
+    async def acquire(self, chat_id: int, priority: Priority = Priority.NORMAL) -> bool:
+        """
+        Wait until a message to chat_id may be sent.
+
+        Args:
+            chat_id: Destination Telegram chat ID
+            priority: Send priority
+
+        Returns:
+            False if no slot was granted within telegram_rate_max_wait_s (the send should be
+            skipped or deferred). Also True if Redis is unavailable (fail open).
+        """
+        reserve = {
+            Priority.USER: 0,
+            Priority.NORMAL: settings.telegram_rate_reserve_normal,
+            Priority.BULK: settings.telegram_rate_reserve_bulk,
+        }[priority]
+        deadline = time.monotonic() + settings.telegram_rate_max_wait_s
+        while True:
+            try:
+                wait_ms = await self._try_acquire(chat_id, reserve)
+            except Exception as e:
+                logger.warning(f"[RATE_GOVERNOR] Redis unavailable, sending unthrottled: {e}")
+                return True
+            if wait_ms == 0:
+                return True
+            # Jitter spreads out processes waking up for the same tokens
+            delay = wait_ms / 1000 * random.uniform(1.0, 1.5)
+            if time.monotonic() + delay > deadline:
+                logger.warning(f"[RATE_GOVERNOR] No send slot for chat {chat_id} ({priority.name})")
+                return False
+            await asyncio.sleep(delay)
+
+    async def _try_acquire(self, chat_id: int, reserve: int) -> int:
+        redis = await get_redis()
+        if self._script is None:
+            self._script = redis.register_script(_ACQUIRE_SCRIPT)
+        return int(
+            await self._script(
+                client=redis,
+                keys=[GLOBAL_BUCKET_KEY, chat_bucket_key(chat_id)],
+                args=[
+                    settings.telegram_rate_global_per_s,
+                    settings.telegram_rate_global_burst,
+                    settings.telegram_rate_chat_per_s,
+                    settings.telegram_rate_chat_burst,
+                    reserve,
+                ],
+            )
+        )
+
+
+# Global rate governor instance
+rate_governor = RateGovernor()
@@ -0,0 +1,14 @@
+"""Change notifications for recent_contacts (match exclusions)."""
+
+from collections.abc import Iterable
+
+from core.redis import get_redis
+
+# Redis pub/sub channel announcing that recent_contacts rows changed (payload: comma-separated user IDs)
+RECENT_CONTACTS_CHANNEL = "recent_contacts.changed"
+
+
+async def publish_recent_contacts_changed(user_ids: Iterable[int]) -> None:
+    """Notify match workers that recent_contacts were upserted for these users."""
+    redis = await get_redis()
+    await redis.publish(RECENT_CONTACTS_CHANNEL, ",".join(map(str, user_ids)))
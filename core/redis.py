@@ -1,3 +1,6 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
 from typing import TYPE_CHECKING, Any
 
 import redis.asyncio as redis
@@ -7,6 +10,8 @@ from core.config import settings
 if TYPE_CHECKING:
     pass
 
+logger = logging.getLogger(__name__)
+
 _redis_client: "redis.Redis[Any] | None" = None
 
 
@@ -28,3 +33,38 @@ async def close_redis() -> None:
     if _redis_client:
         await _redis_client.close()
         _redis_client = None
+
+
+async def listen_channel(
+    channel: str,
+    handler: Callable[[str], Awaitable[None]],
+    on_resubscribe: Callable[[], Awaitable[None]] | None = None,
+) -> None:
+    """
+    Call handler for every message published to a channel, until cancelled.
+
+    Resubscribes after connection errors; on_resubscribe runs first so the
+    caller can resync state for messages missed while disconnected.
+    """
+    client = await get_redis()
+    while True:
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(channel)
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    await handler(message["data"])
+                except Exception as e:
+                    logger.error(f"Handler for {channel} failed on {message['data']!r}: {e}")
+        except Exception as e:
+            logger.error(f"Subscription to {channel} lost: {e}")
+            await asyncio.sleep(5)
+            if on_resubscribe:
+                try:
+                    await on_resubscribe()
+                except Exception as resync_error:
+                    logger.error(f"Resync for {channel} failed: {resync_error}")
+        finally:
+            await pubsub.close()
@@ -0,0 +1,118 @@
+"""Redis cache of relay routes: sender tg_id -> active chat peer."""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from core.config import settings
+from core.redis import get_redis
+
+
+@dataclass
+class RelayRoute:
+    """Where a sender's messages go while their chat is active."""
+
+    chat_session_id: int
+    peer_tg_id: int
+    nickname: str  # sender's nickname, shown to the peer
+    side: str  # "a" or "b": sender's side of the match (selects msg_count_a/msg_count_b)
+
+
+def route_key(tg_id: int) -> str:
+    """Redis key of a sender's route."""
+    return f"relay.route:{tg_id}"
+
+
+def ended_key(tg_id: int) -> str:
+    """Redis key marking a sender's chat as just ended; blocks refilling the route from a stale read."""
+    return f"relay.route.ended:{tg_id}"
+
+
+# Writes a route (KEYS[1]) unless the sender's chat was just ended (KEYS[2] exists).
+# ARGV[1] is the TTL, the rest are field/value pairs. Returns 1 if the route was written.
+_FILL_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+
+
+def _fields(route: RelayRoute) -> dict[str, str | int]:
+    return {
+        "chat_session_id": route.chat_session_id,
+        "peer_tg_id": route.peer_tg_id,
+        "nickname": route.nickname,
+        "side": route.side,
+    }
+
+
+async def get_relay_route(tg_id: int) -> RelayRoute | None:
+    """Cached route of a sender, or None on a miss; a hit extends the route's TTL."""
+    redis = await get_redis()
+    pipe = redis.pipeline(transaction=False)
+    pipe.hgetall(route_key(tg_id))
+    pipe.expire(route_key(tg_id), settings.relay_route_ttl_s)
+    data, _ = await pipe.execute()
+    if not data:
+        return None
+    return RelayRoute(
+        chat_session_id=int(data["chat_session_id"]),
+        peer_tg_id=int(data["peer_tg_id"]),
+        nickname=data["nickname"],
+        side=data["side"],
+    )
+
+
+async def set_relay_routes(routes: dict[int, RelayRoute]) -> None:
+    """
+    Cache the routes of newly activated chats (sender tg_id -> route).
+
+    Clears any ended-chat marker of the senders; idle routes expire after
+    relay_route_ttl_s.
+    """
+    redis = await get_redis()
+    pipe = redis.pipeline(transaction=False)
+    for tg_id, route in routes.items():
+        key = route_key(tg_id)
+        pipe.delete(key, ended_key(tg_id))
+        pipe.hset(key, mapping=_fields(route))
+        pipe.expire(key, settings.relay_route_ttl_s)
+    await pipe.execute()
+
+
+async def fill_relay_route(tg_id: int, route: RelayRoute) -> bool:
+    """
+    Cache a route read from the database after a cache miss.
+
+    The write is skipped if the chat was ended in the meantime
+    (invalidate_relay_routes ran after the route was read), so a slow relay
+    cannot resurrect the route of an ended chat.
+
+    Returns:
+        True if the route was cached
+    """
+    redis = await get_redis()
+    script = redis.register_script(_FILL_SCRIPT)
+    args = [settings.relay_route_ttl_s, *(value for item in _fields(route).items() for value in item)]
+    return bool(await script(client=redis, keys=[route_key(tg_id), ended_key(tg_id)], args=args))
+
+
+async def invalidate_relay_routes(tg_ids: Iterable[int]) -> None:
+    """
+    Drop cached routes when their chat ends.
+
+    Also marks the senders' chats as ended for relay_route_ended_ttl_s, so
+    that relays which read the chat before it ended do not re-cache it.
+    """
+    tg_ids = list(tg_ids)
+    if not tg_ids:
+        return
+    redis = await get_redis()
+    pipe = redis.pipeline(transaction=True)
+    for tg_id in tg_ids:
+        pipe.set(ended_key(tg_id), 1, ex=settings.relay_route_ended_ttl_s)
+    pipe.delete(*(route_key(tg_id) for tg_id in tg_ids))
+    await pipe.execute()
@@ -0,0 +1,126 @@
+"""Incrementally maintained helpfulness (reputation) scores."""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.redis import get_redis
+from models.reputation import UserReputation
+
+# Redis pub/sub channel announcing score changes (payload: "user_id:score,...")
+REPUTATION_CHANNEL = "reputation.changed"
+
+# Bayesian prior: a new user behaves like PRIOR_WEIGHT ratings of PRIOR_MEAN (neutral 0.5 score)
+PRIOR_MEAN = 3.0
+PRIOR_WEIGHT = 5
+
+# Each received tip adds TIP_BONUS, up to TIP_BONUS_CAP in total
+TIP_BONUS = 0.02
+TIP_BONUS_CAP = 0.1
+
+# Each report received subtracts REPORT_PENALTY
+REPORT_PENALTY = 0.1
+
+# Score of users without any history
+NEUTRAL_SCORE = 0.5
+
+
+@dataclass
+class ReputationDelta:
+    """Change to a user's reputation counters."""
+
+    rating_sum: int = 0
+    rating_count: int = 0
+    sessions: int = 0
+    tips_received: int = 0
+    reports_received: int = 0
+
+
+def _score(
+    rating_sum: Any,
+    rating_count: Any,
+    tips: Any,
+    reports: Any,
+    least: Callable[[Any, Any], Any],
+    greatest: Callable[[Any, Any], Any],
+) -> Any:
+    """Scoring formula, shared by Python values and SQL expressions."""
+    # Bayesian average of 1-5 ratings, mapped to 0..1
+    bayes = (PRIOR_WEIGHT * PRIOR_MEAN + rating_sum) / (PRIOR_WEIGHT + rating_count)
+    score = (bayes - 1.0) / 4.0 + least(tips * TIP_BONUS, TIP_BONUS_CAP) - reports * REPORT_PENALTY
+    return greatest(0.0, least(1.0, score))
+
+
+def compute_score(rating_sum: int, rating_count: int, tips_received: int, reports_received: int) -> float:
+    """Helpfulness score in 0..1 from reputation counters."""
+    return float(_score(rating_sum, rating_count, tips_received, reports_received, min, max))
+
+
+async def record_reputation(db: AsyncSession, deltas: dict[int, ReputationDelta]) -> dict[int, float]:
+    """
+    Apply counter deltas with one upsert and publish the new scores.
+
+    Counters and the precomputed score are updated in the same statement;
+    the scores are then announced on REPUTATION_CHANNEL so match workers
+    refresh them in place.
+
+    Args:
+        db: Database session (committed by this function)
+        deltas: Internal user ID -> counter changes
+
+    Returns:
+        New score per user
+    """
+    if not deltas:
+        return {}
+
+    table = UserReputation.__table__
+    stmt = insert(UserReputation).values(
+        [
+            {
+                "user_id": user_id,
+                "rating_sum": delta.rating_sum,
+                "rating_count": delta.rating_count,
+                "sessions": delta.sessions,
+                "tips_received": delta.tips_received,
+                "reports_received": delta.reports_received,
+                "score": compute_score(
+                    delta.rating_sum, delta.rating_count, delta.tips_received, delta.reports_received
+                ),
+                "updated_at": datetime.utcnow(),
+            }
+            for user_id, delta in deltas.items()
+        ]
+    )
+    totals = {
+        column: table.c[column] + stmt.excluded[column]
+        for column in ("rating_sum", "rating_count", "sessions", "tips_received", "reports_received")
+    }
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={
+            **totals,
+            "score": _score(
+                totals["rating_sum"],
+                totals["rating_count"],
+                totals["tips_received"],
+                totals["reports_received"],
+                func.least,
+                func.greatest,
+            ),
+            "updated_at": stmt.excluded.updated_at,
+        },
+    ).returning(UserReputation.user_id, UserReputation.score)
+
+    result = await db.execute(stmt)
+    scores = dict(result.all())
+    await db.commit()
+
+    redis = await get_redis()
+    await redis.publish(REPUTATION_CHANNEL, ",".join(f"{user_id}:{score:.4f}" for user_id, score in scores.items()))
+    return scores
@@ -0,0 +1,84 @@
+"""Process-wide cache of the topics table (slug <-> id, titles)."""
+
+import logging
+import time
+from collections.abc import Iterable
+
+from sqlalchemy import select
+
+from core.config import settings
+from core.db import AsyncSessionLocal
+from core.redis import get_redis
+from models.topic import Topic
+
+logger = logging.getLogger(__name__)
+
+# Redis counter bumped whenever the topics table changes; processes reload when it moves.
+# Topics are only written by migrations, which don't bump it: while the key is missing,
+# processes reload on every check instead.
+TOPIC_CATALOG_VERSION_KEY = "topics.version"
+
+
+async def bump_topic_catalog_version() -> None:
+    """Tell every process to reload the topic catalog (call after changing the topics table)."""
+    redis = await get_redis()
+    await redis.incr(TOPIC_CATALOG_VERSION_KEY)
+
+
+class TopicCatalog:
+    """
+    In-memory copy of the topics table.
+
+    Loaded on first use and reloaded when TOPIC_CATALOG_VERSION_KEY changes,
+    or on every check while the key does not exist; the version is checked
+    at most every topic_catalog_check_s seconds, so slug/id/title lookups are
+    dictionary reads on every hot path.
+    """
+
+    def __init__(self) -> None:
+        self.ids_by_slug: dict[str, int] = {}
+        self.slugs_by_id: dict[int, str] = {}
+        self.titles_by_id: dict[int, str] = {}
+        self.version: str | None = None
+        self.loaded = False
+        self._checked_at = 0.0
+
+    async def ensure_loaded(self) -> None:
+        """Load the catalog, or reload it if the shared version moved (or is unset) since the last check."""
+        if self.loaded and time.monotonic() - self._checked_at < settings.topic_catalog_check_s:
+            return
+
+        redis = await get_redis()
+        version = await redis.get(TOPIC_CATALOG_VERSION_KEY)
+        self._checked_at = time.monotonic()
+        if self.loaded and version is not None and version == self.version:
+            return
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Topic.id, Topic.slug, Topic.title))
+            rows = result.all()
+        self.ids_by_slug = {slug: topic_id for topic_id, slug, _ in rows}
+        self.slugs_by_id = {topic_id: slug for topic_id, slug, _ in rows}
+        self.titles_by_id = {topic_id: title for topic_id, _, title in rows}
+        self.version = version
+        self.loaded = True
+        logger.info(f"[TOPIC_CATALOG] Loaded {len(rows)} topics (version={version})")
+
+    async def ids_for(self, slugs: Iterable[str]) -> dict[str, int]:
+        """Resolve slugs to topic IDs; unknown slugs are left out."""
+        await self.ensure_loaded()
+        return {slug: self.ids_by_slug[slug] for slug in slugs if slug in self.ids_by_slug}
+
+    async def slugs_for(self, topic_ids: Iterable[int]) -> list[str]:
+        """Slugs of the given topic IDs, in the given order; unknown IDs are left out."""
+        await self.ensure_loaded()
+        return [self.slugs_by_id[topic_id] for topic_id in topic_ids if topic_id in self.slugs_by_id]
+
+    async def titles_for(self, topic_ids: Iterable[int]) -> list[str]:
+        """Titles of the given topic IDs, in the given order; unknown IDs are left out."""
+        await self.ensure_loaded()
+        return [self.titles_by_id[topic_id] for topic_id in topic_ids if topic_id in self.titles_by_id]
+
+
+# Global catalog instance
+topic_catalog = TopicCatalog()
@@ -0,0 +1,70 @@
+"""Request-scoped batched loading of User rows."""
+
+from collections.abc import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.user import User
+
+# Key of the loader in AsyncSession.info
+_SESSION_KEY = "user_loader"
+
+
+class UserLoader:
+    """
+    Memoizing User loader bound to one database session.
+
+    Every missing ID of a call is fetched with a single ``WHERE id IN (...)``
+    query; rows already loaded are served from memory. Not safe for
+    concurrent use: load everything needed before fanning out tasks that
+    share the session.
+    """
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+        self.by_id: dict[int, User | None] = {}  # None = known to be missing
+        self.by_tg_id: dict[int, User] = {}
+
+    async def load_many(self, user_ids: Iterable[int]) -> dict[int, User]:
+        """
+        Load users by internal ID.
+
+        Returns:
+            Internal user ID -> User, for the IDs that exist
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        missing = [user_id for user_id in user_ids if user_id not in self.by_id]
+        if missing:
+            result = await self.db.execute(select(User).where(User.id.in_(missing)))
+            for user in result.scalars().all():
+                self._remember(user)
+            for user_id in missing:
+                self.by_id.setdefault(user_id, None)
+        return {user_id: user for user_id in user_ids if (user := self.by_id[user_id]) is not None}
+
+    async def get(self, user_id: int) -> User | None:
+        """Load one user by internal ID."""
+        return (await self.load_many([user_id])).get(user_id)
+
+    async def get_by_tg_id(self, tg_id: int) -> User | None:
+        """Load one user by Telegram ID."""
+        user = self.by_tg_id.get(tg_id)
+        if user is None:
+            result = await self.db.execute(select(User).where(User.tg_id == tg_id))
+            user = result.scalar_one_or_none()
+            if user is not None:
+                self._remember(user)
+        return user
+
+    def _remember(self, user: User) -> None:
+        self.by_id[user.id] = user
+        self.by_tg_id[user.tg_id] = user
+
+
+def user_loader(db: AsyncSession) -> UserLoader:
+    """Loader shared by everything using this session (one per request)."""
+    loader = db.info.get(_SESSION_KEY)
+    if loader is None:
+        loader = db.info[_SESSION_KEY] = UserLoader(db)
+    return loader
@@ -0,0 +1,12 @@
+"""Change notifications for users' topic sets."""
+
+from core.redis import get_redis
+
+# Redis pub/sub channel announcing that a user's topics changed (payload: internal user_id)
+USER_TOPICS_CHANNEL = "user_topics.changed"
+
+
+async def publish_user_topics_changed(user_id: int) -> None:
+    """Notify match workers that a user's topics were updated."""
+    redis = await get_redis()
+    await redis.publish(USER_TOPICS_CHANNEL, str(user_id))
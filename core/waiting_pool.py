@@ -0,0 +1,204 @@
+"""Redis-resident pool of users currently searching for a match."""
+
+import time
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.redis import get_redis
+from models.match import Match
+from models.topic import UserTopic
+
+
+def topic_key(topic_id: int) -> str:
+    """Sorted set of searching user IDs for a topic, scored by enqueue time."""
+    return f"match.waiting:{topic_id}"
+
+
+def user_key(user_id: int) -> str:
+    """Topic IDs a searching user was enqueued under (expires with the search)."""
+    return f"match.waiting.user:{user_id}"
+
+
+def search_key(user_id: int) -> str:
+    """Stream ID of the user's queued match.find entry, held until a worker processes it."""
+    return f"match.search:{user_id}"
+
+
+# Deletes each search reservation KEYS[i] only while it still holds stream ID ARGV[i]
+_RELEASE_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[i] then
+        redis.call('DEL', key)
+    end
+end
+return 0
+"""
+
+
+async def begin_search(user_id: int) -> str | None:
+    """
+    Reserve the user's single in-flight search.
+
+    If queueing the search fails after the reservation was taken, release it
+    with cancel_search so the user is not locked out until the TTL expires.
+
+    Args:
+        user_id: Internal user ID
+
+    Returns:
+        None if the reservation was taken, otherwise the stream ID of the search
+        already queued ("" while its XADD is still in progress)
+    """
+    redis = await get_redis()
+    pipe = redis.pipeline(transaction=False)
+    pipe.set(search_key(user_id), "", nx=True, ex=settings.match_wait_ttl_s)
+    pipe.get(search_key(user_id))
+    acquired, current = await pipe.execute()
+    return None if acquired else current or ""
+
+
+async def cancel_search(user_id: int) -> None:
+    """Release a search reservation whose entry never made it into the stream."""
+    redis = await get_redis()
+    await redis.delete(search_key(user_id))
+
+
+async def record_search_entry(user_id: int, stream_id: str) -> None:
+    """Store the stream ID of a reserved search (see begin_search)."""
+    redis = await get_redis()
+    await redis.set(search_key(user_id), stream_id, xx=True, keepttl=True)
+
+
+def release_searches(pipe: Any, entries: dict[int, str]) -> None:
+    """
+    Queue the release of processed searches so a new /find may enqueue again.
+
+    A reservation is only deleted while it still holds the processed stream
+    ID; one taken by a newer /find tap in the meantime is kept.
+
+    Args:
+        pipe: Redis pipeline the command is added to
+        entries: Internal user ID -> stream ID of the processed entry
+    """
+    if entries:
+        pipe.eval(_RELEASE_SCRIPT, len(entries), *map(search_key, entries), *entries.values())
+
+
+async def searching_users(user_ids: Iterable[int]) -> set[int]:
+    """Return the users that are still in the waiting pool (not matched, not expired)."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return set()
+    redis = await get_redis()
+    topic_lists = await redis.mget([user_key(user_id) for user_id in user_ids])
+    return {user_id for user_id, topic_list in zip(user_ids, topic_lists, strict=True) if topic_list is not None}
+
+
+async def add_to_waiting_pool(user_id: int, topic_ids: Iterable[int]) -> None:
+    """
+    Mark a user as searching under each of their topics.
+
+    Args:
+        user_id: Internal user ID
+        topic_ids: User's topic IDs
+    """
+    await add_many_to_waiting_pool({user_id: topic_ids})
+
+
+async def add_many_to_waiting_pool(topics_by_user: dict[int, Iterable[int]]) -> None:
+    """
+    Mark several users as searching in one round trip.
+
+    Args:
+        topics_by_user: Internal user ID -> topic IDs
+    """
+    if not topics_by_user:
+        return
+    redis = await get_redis()
+    now = time.time()
+    pipe = redis.pipeline(transaction=False)
+    for user_id, topic_ids in topics_by_user.items():
+        topic_ids = list(topic_ids)
+        for topic_id in topic_ids:
+            pipe.zadd(topic_key(topic_id), {str(user_id): now})
+        pipe.set(user_key(user_id), ",".join(map(str, topic_ids)), ex=settings.match_wait_ttl_s)
+    await pipe.execute()
+
+
+async def requeue_unmatched(db: AsyncSession, user_ids: Iterable[int]) -> list[int]:
+    """
+    Return users to the waiting pool after their proposal expired or was declined.
+
+    Users with another open (proposed or active) match are skipped.
+
+    Args:
+        db: Database session
+        user_ids: Internal user IDs
+
+    Returns:
+        Users put back into the pool
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return []
+    busy_result = await db.execute(
+        select(Match.user_a, Match.user_b).where(
+            Match.status.in_(("proposed", "active")),
+            or_(Match.user_a.in_(user_ids), Match.user_b.in_(user_ids)),
+        )
+    )
+    busy = {user_id for row in busy_result.all() for user_id in row}
+
+    free = [user_id for user_id in user_ids if user_id not in busy]
+    if not free:
+        return []
+    topic_result = await db.execute(select(UserTopic.user_id, UserTopic.topic_id).where(UserTopic.user_id.in_(free)))
+    topics_by_user: dict[int, list[int]] = {}
+    for user_id, topic_id in topic_result.all():
+        topics_by_user.setdefault(user_id, []).append(topic_id)
+    await add_many_to_waiting_pool(topics_by_user)
+    return list(topics_by_user)
+
+
+async def remove_from_waiting_pool(user_ids: Iterable[int]) -> None:
+    """
+    Remove users from the waiting pool (matched, expired or cancelled).
+
+    Args:
+        user_ids: Internal user IDs
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    redis = await get_redis()
+    topic_lists = await redis.mget([user_key(user_id) for user_id in user_ids])
+    pipe = redis.pipeline(transaction=False)
+    for user_id, topic_list in zip(user_ids, topic_lists, strict=True):
+        for topic_id in filter(None, (topic_list or "").split(",")):
+            pipe.zrem(topic_key(int(topic_id)), str(user_id))
+        pipe.delete(user_key(user_id))
+    await pipe.execute()
+
+
+async def live_searchers(topic_ids: Iterable[int]) -> set[int]:
+    """
+    Return users currently searching under any of the given topics.
+
+    Entries older than match_wait_ttl_s are dropped first; pruning and the
+    ZUNION share one round trip.
+    """
+    keys = [topic_key(topic_id) for topic_id in topic_ids]
+    if not keys:
+        return set()
+    redis = await get_redis()
+    cutoff = time.time() - settings.match_wait_ttl_s
+    pipe = redis.pipeline(transaction=False)
+    for key in keys:
+        pipe.zremrangebyscore(key, "-inf", cutoff)
+    pipe.zunion(keys)
+    *_, members = await pipe.execute()
+    return {int(member) for member in members}
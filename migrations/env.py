@@ -20,6 +20,7 @@ from models import (  # noqa: F401
     Tip,
     Topic,
     User,
+    UserReputation,
     UserTopic,
 )
 
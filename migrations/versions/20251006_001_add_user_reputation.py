@@ -0,0 +1,79 @@
+"""Add user_reputation aggregate for helpfulness scoring
+
+Revision ID: 20251006_001
+Revises: 20251005_002
+Create Date: 2025-10-06
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20251006_001"
+down_revision = "20251005_002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_reputation (
+            user_id BIGINT PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+            rating_sum INTEGER NOT NULL DEFAULT 0,
+            rating_count INTEGER NOT NULL DEFAULT 0,
+            sessions INTEGER NOT NULL DEFAULT 0,
+            tips_received INTEGER NOT NULL DEFAULT 0,
+            reports_received INTEGER NOT NULL DEFAULT 0,
+            score DOUBLE PRECISION NOT NULL DEFAULT 0.5,
+            updated_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
+        )
+    """
+    )
+
+    # Backfill counters from existing history; score uses the formula of core.reputation._score
+    # (prior of 5 ratings of 3.0, +0.02 per tip capped at 0.1, -0.1 per report, clamped to 0..1)
+    op.execute(
+        """
+        INSERT INTO user_reputation (
+            user_id, rating_sum, rating_count, sessions, tips_received, reports_received, score
+        )
+        SELECT user_id, rating_sum, rating_count, sessions, tips_received, reports_received,
+               GREATEST(0.0, LEAST(1.0,
+                   ((5 * 3.0 + rating_sum) / (5 + rating_count) - 1.0) / 4.0
+                   + LEAST(tips_received * 0.02, 0.1)
+                   - reports_received * 0.1
+               ))
+        FROM (
+            SELECT user_id,
+                   SUM(rating_sum)::int AS rating_sum,
+                   SUM(rating_count)::int AS rating_count,
+                   SUM(sessions)::int AS sessions,
+                   SUM(tips_received)::int AS tips_received,
+                   SUM(reports_received)::int AS reports_received
+            FROM (
+                -- rating_a is user_a's rating of user_b and vice versa
+                SELECT m.user_a AS user_id, COALESCE(cs.rating_b, 0) AS rating_sum,
+                       (cs.rating_b IS NOT NULL)::int AS rating_count, 1 AS sessions,
+                       0 AS tips_received, 0 AS reports_received
+                FROM chat_sessions cs JOIN matches m ON m.id = cs.match_id
+                WHERE cs.ended_at IS NOT NULL
+                UNION ALL
+                SELECT m.user_b, COALESCE(cs.rating_a, 0), (cs.rating_a IS NOT NULL)::int, 1, 0, 0
+                FROM chat_sessions cs JOIN matches m ON m.id = cs.match_id
+                WHERE cs.ended_at IS NOT NULL
+                UNION ALL
+                SELECT to_user, 0, 0, 0, 1, 0 FROM tips WHERE status = 'paid'
+                UNION ALL
+                SELECT to_user, 0, 0, 0, 0, 1 FROM reports
+            ) contributions
+            WHERE user_id IN (SELECT id FROM users)
+            GROUP BY user_id
+        ) totals
+        ON CONFLICT (user_id) DO NOTHING
+    """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS user_reputation")
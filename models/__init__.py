@@ -4,6 +4,7 @@ from models.ai import AiHint, SafetyFlag
 from models.chat import ChatSession
 from models.match import Match
 from models.recent_contact import RecentContact
+from models.reputation import UserReputation
 from models.safety import ModerationAction, Report
 from models.tip import Tip
 from models.topic import Topic, UserTopic
@@ -19,6 +20,7 @@ __all__ = [
     "AiHint",
     "SafetyFlag",
     "RecentContact",
+    "UserReputation",
     "Report",
     "ModerationAction",
 ]
@@ -0,0 +1,28 @@
+"""Per-user reputation aggregate used for helpfulness scoring."""
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Float, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.db import Base
+
+
+class UserReputation(Base):
+    """Running totals of a user's ratings, tips and reports, updated incrementally."""
+
+    __tablename__ = "user_reputation"
+
+    user_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, nullable=False
+    )
+    rating_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # Sum of 1-5 ratings received
+    rating_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    sessions: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # Completed chat sessions
+    tips_received: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    reports_received: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    score: Mapped[float] = mapped_column(Float, nullable=False, default=0.5)  # Precomputed helpfulness, 0..1
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<UserReputation(user_id={self.user_id}, score={self.score:.3f})>"
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Matchmaking simulation and benchmark.
+
+Generates a synthetic population (users, weighted topics, timezones, recent
+contacts), replays a /find arrival curve through MatchWorker and reports
+p50/p99 match latency, matches/sec, DB queries per match and match quality.
+
+Latency is measured on a virtual clock: each request arrives at its curve
+time, waits for the worker to finish earlier requests and is then processed
+for real, so queueing under bursts shows up in p99 without sleeping.
+
+Usage:
+  python scripts/benchmark_matching.py --users 100k --requests 20000
+  python scripts/benchmark_matching.py --mode postgres --users 10k --requests 2000 --cleanup
+  python scripts/benchmark_matching.py --users 1M --requests 50000 --json bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apps.workers.match_worker import MatchWorker
+
+# Timezones with rough population shares of the user base
+TIMEZONES = {
+    "Europe/Moscow": 0.45,
+    "Europe/Kaliningrad": 0.04,
+    "Europe/Samara": 0.06,
+    "Asia/Yekaterinburg": 0.1,
+    "Asia/Novosibirsk": 0.08,
+    "Asia/Vladivostok": 0.05,
+    "Europe/Berlin": 0.08,
+    "Asia/Almaty": 0.06,
+    "America/New_York": 0.04,
+    "Asia/Tbilisi": 0.04,
+}
+
+# Synthetic users get tg_ids from here on so they can be told apart and cleaned up
+BENCH_TG_ID_OFFSET = 9_000_000_000_000
+
+
+@dataclass
+class Population:
+    """Synthetic users in index order."""
+
+    topic_ids: list[list[int]]
+    weights: list[list[int]]
+    timezones: list[str]
+    contacts: list[np.ndarray]  # row indexes of recent contacts per user
+    user_ids: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+
+
+@dataclass
+class Report:
+    """Benchmark results."""
+
+    mode: str
+    users: int
+    requests: int
+    matches: int
+    duration_s: float
+    matches_per_s: float
+    latency_p50_ms: float
+    latency_p99_ms: float
+    service_p50_ms: float
+    service_p99_ms: float
+    db_queries_per_match: float | None
+    quality_mean: float
+    quality_p10: float
+
+
+def parse_size(value: str) -> int:
+    """Parse sizes such as 10k, 100k or 1M."""
+    value = value.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(value[-1], 1)
+    return int(float(value.rstrip("km")) * multiplier)
+
+
+def generate_population(
+    size: int, topic_ids: list[int], contacts_per_user: float, rng: np.random.Generator
+) -> Population:
+    """
+    Draw a population with Zipf-like topic popularity.
+
+    Args:
+        size: Number of users
+        topic_ids: Available topic IDs
+        contacts_per_user: Mean number of recent contacts per user
+        rng: Random generator
+
+    Returns:
+        Generated population (user_ids filled in later)
+    """
+    popularity = 1.0 / np.arange(1, len(topic_ids) + 1)
+    popularity /= popularity.sum()
+    counts = rng.integers(2, min(5, len(topic_ids)) + 1, size=size)
+
+    topics: list[list[int]] = []
+    weights: list[list[int]] = []
+    for count in counts:
+        chosen = rng.choice(len(topic_ids), size=count, replace=False, p=popularity)
+        topics.append([topic_ids[i] for i in chosen])
+        weights.append(rng.integers(1, 4, size=count).tolist())
+
+    tz_names = list(TIMEZONES)
+    tz_p = np.array(list(TIMEZONES.values()))
+    timezones = [tz_names[i] for i in rng.choice(len(tz_names), size=size, p=tz_p / tz_p.sum())]
+
+    contact_counts = rng.poisson(contacts_per_user, size=size)
+    contacts = [np.unique(rng.integers(0, size, size=n)) for n in contact_counts]
+    return Population(topics, weights, timezones, contacts)
+
+
+def arrival_times(requests: int, duration_s: float, rng: np.random.Generator) -> np.ndarray:
+    """
+    Arrival times of /find requests over duration_s.
+
+    The rate follows an evening-peak curve (one sinusoidal period) with a
+    short burst in the middle, similar to traffic after a broadcast message.
+    """
+    grid = np.linspace(0.0, 1.0, 1000)
+    rate = 1.0 + 0.8 * np.sin(2 * np.pi * (grid - 0.25))
+    rate += 3.0 * np.exp(-(((grid - 0.5) / 0.01) ** 2))
+    cdf = np.cumsum(rate)
+    cdf /= cdf[-1]
+    return np.sort(np.interp(rng.random(requests), cdf, grid)) * duration_s
+
+
+def percentile_ms(values: list[float], q: float) -> float:
+    return float(np.percentile(values, q) * 1000) if values else 0.0
+
+
+def pair_quality(worker: MatchWorker, user_id: int, topic_ids: set[int], tz: str, partner_id: int) -> float:
+    """Score of a chosen pair under the worker's scoring formula."""
+    index = worker.topic_index
+    rows = np.array([index.rows[partner_id]], dtype=np.int64)
+    return float(worker._candidate_scores(topic_ids, rows, index.timezones.code_of(tz))[0])
+
+
+async def run_memory(
+    args: argparse.Namespace, population: Population, arrivals: np.ndarray, picks: np.ndarray
+) -> Report:
+    """Run the in-process matching stages (index, candidate search, scoring) without Postgres or Redis."""
+    worker = MatchWorker()
+    index = worker.topic_index
+    population.user_ids = np.arange(1, len(population.timezones) + 1, dtype=np.int64)
+    for row, user_id in enumerate(population.user_ids.tolist()):
+        index.set_user(
+            user_id,
+            dict(zip(population.topic_ids[row], population.weights[row], strict=True)),
+            population.timezones[row],
+        )
+    index.loaded = True
+
+    waiting: dict[int, float] = {}  # user_id -> virtual enqueue time
+    latencies: list[float] = []
+    service: list[float] = []
+    quality: list[float] = []
+    clock = 0.0
+    matches = 0
+    started = time.perf_counter()
+    for arrival, row in zip(arrivals.tolist(), picks.tolist(), strict=True):
+        user_id = int(population.user_ids[row])
+        clock = max(clock, arrival)
+        # Searches older than the wait TTL drop out, as ZREMRANGEBYSCORE does in live_searchers
+        waiting = {uid: t for uid, t in waiting.items() if clock - t < args.wait_ttl}
+        waiting[user_id] = arrival
+
+        t0 = time.perf_counter()
+        topic_ids = set(population.topic_ids[row])
+        tz_code = index.timezones.code_of(population.timezones[row])
+        live_ids = np.fromiter(waiting, dtype=np.int64, count=len(waiting))
+        excluded = population.user_ids[population.contacts[row]]
+        candidate_ids, rows = worker._find_candidates(user_id, topic_ids, excluded, tz_code, live_ids)
+        partner = worker._score_candidates(topic_ids, candidate_ids, rows, tz_code)
+        elapsed = time.perf_counter() - t0
+
+        clock += elapsed
+        service.append(elapsed)
+        latencies.append(clock - arrival)
+        if partner is not None:
+            matches += 1
+            quality.append(pair_quality(worker, user_id, topic_ids, population.timezones[row], partner))
+            waiting.pop(user_id, None)
+            waiting.pop(partner, None)
+
+    return build_report(
+        "memory", args, len(population.timezones), arrivals, matches, started, latencies, service, None, quality
+    )
+
+
+async def seed_postgres(population: Population) -> None:
+    """Insert the population into the configured database in chunks."""
+    from sqlalchemy import insert
+
+    from core.db import AsyncSessionLocal
+    from models.recent_contact import RecentContact
+    from models.topic import UserTopic
+    from models.user import User
+
+    size = len(population.timezones)
+    chunk = 5000
+    user_ids = np.zeros(size, dtype=np.int64)
+    async with AsyncSessionLocal() as db:
+        for start in range(0, size, chunk):
+            rows = range(start, min(start + chunk, size))
+            result = await db.execute(
+                insert(User)
+                .values(
+                    [
+                        {
+                            "tg_id": BENCH_TG_ID_OFFSET + row,
+                            "nickname": f"bench{row}",
+                            "tz": population.timezones[row],
+                            "safety_ack": True,
+                            "created_at": datetime.utcnow(),
+                        }
+                        for row in rows
+                    ]
+                )
+                .returning(User.id, User.tg_id)
+            )
+            for user_id, tg_id in result.all():
+                user_ids[tg_id - BENCH_TG_ID_OFFSET] = user_id
+        population.user_ids = user_ids
+
+        until = datetime.now(UTC) + timedelta(days=7)
+        for start in range(0, size, chunk):
+            rows = range(start, min(start + chunk, size))
+            topic_rows = [
+                {"user_id": int(user_ids[row]), "topic_id": topic_id, "weight": weight}
+                for row in rows
+                for topic_id, weight in zip(population.topic_ids[row], population.weights[row], strict=True)
+            ]
+            await db.execute(insert(UserTopic).values(topic_rows))
+            contact_rows = [
+                {"user_id": int(user_ids[row]), "other_id": int(user_ids[other]), "until": until}
+                for row in rows
+                for other in population.contacts[row].tolist()
+                if other != row
+            ]
+            if contact_rows:
+                await db.execute(insert(RecentContact).values(contact_rows))
+        await db.commit()
+    print(f"🌱 Seeded {size} users")
+
+
+async def cleanup_postgres() -> None:
+    """Delete synthetic users (cascades to topics and contacts), their matches and waiting-pool entries."""
+    from sqlalchemy import delete, or_, select
+
+    from core.db import AsyncSessionLocal
+    from core.waiting_pool import remove_from_waiting_pool
+    from models.match import Match
+    from models.user import User
+
+    async with AsyncSessionLocal() as db:
+        bench_users = select(User.id).where(User.tg_id >= BENCH_TG_ID_OFFSET)
+        await remove_from_waiting_pool((await db.execute(bench_users)).scalars().all())
+        await db.execute(delete(Match).where(or_(Match.user_a.in_(bench_users), Match.user_b.in_(bench_users))))
+        await db.execute(delete(User).where(User.tg_id >= BENCH_TG_ID_OFFSET))
+        await db.commit()
+    print("🧹 Removed synthetic users")
+
+
+async def run_postgres(
+    args: argparse.Namespace, population: Population, arrivals: np.ndarray, picks: np.ndarray
+) -> Report:
+    """Replay requests through MatchWorker.process_match_request against the configured Postgres and Redis."""
+    from sqlalchemy import event, select
+
+    from core.db import AsyncSessionLocal, engine
+    from core.waiting_pool import add_to_waiting_pool
+    from models.topic import Topic
+
+    await seed_postgres(population)
+    async with AsyncSessionLocal() as db:
+        slug_by_id = dict((await db.execute(select(Topic.id, Topic.slug))).all())
+
+    queries = 0
+
+    def count_query(*_: object) -> None:
+        nonlocal queries
+        queries += 1
+
+    worker = MatchWorker()
+    await worker.topic_index.load()
+    event.listen(engine.sync_engine, "before_cursor_execute", count_query)
+
+    latencies: list[float] = []
+    service: list[float] = []
+    quality: list[float] = []
+    clock = 0.0
+    matches = 0
+    started = time.perf_counter()
+    try:
+        for arrival, row in zip(arrivals.tolist(), picks.tolist(), strict=True):
+            user_id = int(population.user_ids[row])
+            topic_ids = population.topic_ids[row]
+            clock = max(clock, arrival)
+
+            t0 = time.perf_counter()
+            await add_to_waiting_pool(user_id, topic_ids)
+            match = await worker.process_match_request(
+                user_id, [slug_by_id[topic_id] for topic_id in topic_ids], population.timezones[row]
+            )
+            elapsed = time.perf_counter() - t0
+
+            clock += elapsed
+            service.append(elapsed)
+            latencies.append(clock - arrival)
+            if match:
+                matches += 1
+                partner = match.user_b if match.user_a == user_id else match.user_a
+                quality.append(pair_quality(worker, user_id, set(topic_ids), population.timezones[row], partner))
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count_query)
+        if args.cleanup:
+            await cleanup_postgres()
+
+    queries_per_match = queries / matches if matches else None
+    return build_report(
+        "postgres",
+        args,
+        len(population.timezones),
+        arrivals,
+        matches,
+        started,
+        latencies,
+        service,
+        queries_per_match,
+        quality,
+    )
+
+
+def build_report(
+    mode: str,
+    args: argparse.Namespace,
+    users: int,
+    arrivals: np.ndarray,
+    matches: int,
+    started: float,
+    latencies: list[float],
+    service: list[float],
+    queries_per_match: float | None,
+    quality: list[float],
+) -> Report:
+    duration = time.perf_counter() - started
+    return Report(
+        mode=mode,
+        users=users,
+        requests=len(arrivals),
+        matches=matches,
+        duration_s=round(duration, 3),
+        matches_per_s=round(matches / duration, 1) if duration else 0.0,
+        latency_p50_ms=round(percentile_ms(latencies, 50), 2),
+        latency_p99_ms=round(percentile_ms(latencies, 99), 2),
+        service_p50_ms=round(percentile_ms(service, 50), 2),
+        service_p99_ms=round(percentile_ms(service, 99), 2),
+        db_queries_per_match=round(queries_per_match, 2) if queries_per_match is not None else None,
+        quality_mean=round(float(np.mean(quality)), 4) if quality else 0.0,
+        quality_p10=round(float(np.percentile(quality, 10)), 4) if quality else 0.0,
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark MatchWorker on a synthetic population")
+    parser.add_argument("--mode", choices=("memory", "postgres"), default="memory")
+    parser.add_argument(
+        "--users", type=parse_size, default=parse_size("10k"), help="Population size, e.g. 10k, 100k, 1M"
+    )
+    parser.add_argument("--requests", type=parse_size, default=2000, help="Number of /find requests to replay")
+    parser.add_argument("--duration", type=float, default=60.0, help="Length of the arrival curve in seconds")
+    parser.add_argument("--topics", type=int, default=12, help="Synthetic topic count (memory mode)")
+    parser.add_argument("--contacts", type=float, default=3.0, help="Mean recent contacts per user")
+    parser.add_argument("--wait-ttl", type=float, default=900.0, help="Seconds a searcher stays in the waiting pool")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cleanup", action="store_true", help="Delete synthetic users afterwards (postgres mode)")
+    parser.add_argument("--json", help="Also write the report to this file")
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    if args.mode == "postgres":
+        from sqlalchemy import select
+
+        from core.db import AsyncSessionLocal
+        from models.topic import Topic
+
+        async with AsyncSessionLocal() as db:
+            topic_ids = list((await db.scalars(select(Topic.id).order_by(Topic.id))).all())
+    else:
+        topic_ids = list(range(1, args.topics + 1))
+
+    population = generate_population(args.users, topic_ids, args.contacts, rng)
+    arrivals = arrival_times(args.requests, args.duration, rng)
+    picks = rng.integers(0, args.users, size=args.requests)
+    print(
+        f"👥 {args.users} users, {len(topic_ids)} topics, {args.requests} requests over {args.duration}s ({args.mode})"
+    )
+
+    run = run_postgres if args.mode == "postgres" else run_memory
+    report = await run(args, population, arrivals, picks)
+
+    print("📊 Results:")
+    for key, value in asdict(report).items():
+        print(f"   {key}: {value if value is not None else 'n/a'}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(asdict(report), f, indent=2)
+
+
+if __name__ == "__main__":
+    # Load environment variables
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    asyncio.run(main())
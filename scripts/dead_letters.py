@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Inspect and replay dead-lettered match requests (match.dead).
+
+Usage:
+  python scripts/dead_letters.py stats
+  python scripts/dead_letters.py list [--error ValueError] [--user-id 42] [--since 2025-10-05T00:00] [--limit 20]
+  python scripts/dead_letters.py replay [filters] [--batch-size 500] [--rate 1000] [--dry-run]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+from collections.abc import AsyncIterator
+
+from sqlalchemy import select
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.db import AsyncSessionLocal
+from core.dead_letter import original_payload, replay_stream
+from core.match_payload import payload_user_id
+from core.match_streams import DEAD_STREAM
+from core.redis import close_redis, get_redis
+from core.waiting_pool import add_many_to_waiting_pool
+from models.topic import UserTopic
+
+# Entries fetched per XRANGE call while scanning
+SCAN_PAGE = 1000
+
+
+async def scan(args: argparse.Namespace) -> AsyncIterator[tuple[str, dict[str, str]]]:
+    """Yield (entry ID, fields) from match.dead that pass the CLI filters, oldest first."""
+    redis = await get_redis()
+    start = "-"
+    while True:
+        page = await redis.xrange(DEAD_STREAM, min=start, max="+", count=SCAN_PAGE)
+        if not page:
+            return
+        for entry_id, fields in page:
+            if args.error and fields.get("dlq_error") != args.error:
+                continue
+            if args.user_id is not None and payload_user_id(fields) != args.user_id:
+                continue
+            if args.since and fields.get("dlq_failed_at", "") < args.since:
+                continue
+            yield entry_id, fields
+        if len(page) < SCAN_PAGE:
+            return
+        start = f"({page[-1][0]}"
+
+
+async def cmd_stats(args: argparse.Namespace) -> None:
+    """Print dead-letter counts by error class and origin stream."""
+    by_error: Counter[str] = Counter()
+    by_stream: Counter[str] = Counter()
+    async for _, fields in scan(args):
+        by_error[fields.get("dlq_error", "<no context>")] += 1
+        by_stream[fields.get("dlq_stream", "<unknown>")] += 1
+
+    print(f"📦 {DEAD_STREAM}: {sum(by_error.values())} entries")
+    for error, count in by_error.most_common():
+        print(f"   • {error}: {count}")
+    print("   By stream:")
+    for stream, count in by_stream.most_common():
+        print(f"   • {stream}: {count}")
+
+
+async def cmd_list(args: argparse.Namespace) -> None:
+    """Print matching entries."""
+    shown = 0
+    async for entry_id, fields in scan(args):
+        print(
+            f"{entry_id}  user={payload_user_id(fields)}  error={fields.get('dlq_error', '-')}  "
+            f"attempts={fields.get('dlq_attempts', '-')}  failed_at={fields.get('dlq_failed_at', '-')}"
+        )
+        if fields.get("dlq_message"):
+            print(f"    {fields['dlq_message']}")
+        shown += 1
+        if shown >= args.limit:
+            break
+
+
+async def requeue_users(user_ids: set[int]) -> None:
+    """Return users to the waiting pool under their current topics."""
+    if not user_ids:
+        return
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(UserTopic.user_id, UserTopic.topic_id).where(UserTopic.user_id.in_(user_ids)))
+        topics_by_user: dict[int, list[int]] = {}
+        for user_id, topic_id in result.all():
+            topics_by_user.setdefault(user_id, []).append(topic_id)
+    await add_many_to_waiting_pool(topics_by_user)
+
+
+async def cmd_replay(args: argparse.Namespace) -> None:
+    """Move matching entries back to match.find in batches, at most --rate entries per second."""
+    redis = await get_redis()
+    replayed = 0
+    batch: list[tuple[str, dict[str, str]]] = []
+
+    async def flush() -> None:
+        nonlocal replayed
+        if not batch:
+            return
+        started = time.monotonic()
+        if not args.dry_run:
+            # The worker drops requests of users who are no longer searching, so put them back in the pool first
+            await requeue_users({payload_user_id(fields) for _, fields in batch} - {None})
+            # Replayed entries start with a fresh retry budget
+            pipe = redis.pipeline(transaction=False)
+            for _, fields in batch:
+                pipe.xadd(replay_stream(fields), original_payload(fields))
+            pipe.xdel(DEAD_STREAM, *[entry_id for entry_id, _ in batch])
+            await pipe.execute()
+        replayed += len(batch)
+        print(f"{'[dry-run] ' if args.dry_run else ''}Replayed {replayed} entries")
+        # Rate limit: a batch of N entries takes at least N / rate seconds
+        if args.rate > 0:
+            await asyncio.sleep(max(0.0, len(batch) / args.rate - (time.monotonic() - started)))
+        batch.clear()
+
+    async for entry_id, fields in scan(args):
+        batch.append((entry_id, fields))
+        if len(batch) >= args.batch_size:
+            await flush()
+        if args.limit and replayed + len(batch) >= args.limit:
+            break
+    await flush()
+    print(f"✅ Done: {replayed} entries {'would be ' if args.dry_run else ''}replayed")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=f"Inspect and replay {DEAD_STREAM}")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("stats", "list", "replay"):
+        command = commands.add_parser(name)
+        command.add_argument("--error", help="Only entries failed with this exception class")
+        command.add_argument("--user-id", type=int, help="Only entries of this internal user ID")
+        command.add_argument("--since", help="Only entries failed at/after this ISO timestamp")
+        if name == "list":
+            command.add_argument("--limit", type=int, default=20)
+        if name == "replay":
+            command.add_argument("--limit", type=int, default=0, help="Max entries to replay (0 = all)")
+            command.add_argument("--batch-size", type=int, default=500)
+            command.add_argument("--rate", type=float, default=1000.0, help="Max entries per second (0 = unlimited)")
+            command.add_argument("--dry-run", action="store_true")
+
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    try:
+        await {"stats": cmd_stats, "list": cmd_list, "replay": cmd_replay}[args.command](args)
+    finally:
+        await close_redis()
+
+
+if __name__ == "__main__":
+    # Load environment variables
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+"""Tests for match.find retry backoff and dead-lettering."""
+
+import json
+from typing import Any
+
+import pytest
+
+from core.config import settings
+from core.dead_letter import RETRY_KEY, retry_delay_s, schedule_failure
+from core.match_streams import DEAD_STREAM
+
+
+class RecordingPipe:
+    """Stand-in for a Redis pipeline that records queued commands."""
+
+    def __init__(self) -> None:
+        self.commands: list[tuple[str, Any, Any]] = []
+
+    def zadd(self, key: str, mapping: dict[str, float]) -> None:
+        self.commands.append(("zadd", key, mapping))
+
+    def xadd(self, key: str, fields: dict[str, str]) -> None:
+        self.commands.append(("xadd", key, fields))
+
+
+@pytest.fixture(autouse=True)
+def retry_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "match_retry_base_s", 2.0)
+    monkeypatch.setattr(settings, "match_retry_max_s", 30.0)
+    monkeypatch.setattr(settings, "match_retry_max_attempts", 3)
+
+
+def record(attempts: int) -> dict[str, str]:
+    return {"user_id": "7", "dlq_error": "RuntimeError", "dlq_attempts": str(attempts)}
+
+
+def test_retry_delay_doubles_per_attempt() -> None:
+    assert [retry_delay_s(attempts) for attempts in (1, 2, 3, 4)] == [2.0, 4.0, 8.0, 16.0]
+
+
+def test_retry_delay_is_capped() -> None:
+    assert retry_delay_s(5) == 30.0
+    assert retry_delay_s(50) == 30.0
+
+
+def test_retry_delay_before_first_attempt_is_base() -> None:
+    assert retry_delay_s(0) == 2.0
+
+
+def test_schedules_retry_while_attempts_remain() -> None:
+    pipe = RecordingPipe()
+
+    assert schedule_failure(pipe, record(2)) is True
+
+    [(command, key, mapping)] = pipe.commands
+    assert (command, key) == ("zadd", RETRY_KEY)
+    [(member, _due)] = mapping.items()
+    assert json.loads(member) == record(2)
+
+
+def test_dead_letters_once_attempts_run_out() -> None:
+    pipe = RecordingPipe()
+
+    assert schedule_failure(pipe, record(3)) is False
+
+    assert pipe.commands == [("xadd", DEAD_STREAM, record(3))]
+
+
+def test_dead_letters_non_retryable_immediately() -> None:
+    pipe = RecordingPipe()
+
+    assert schedule_failure(pipe, record(1), retryable=False) is False
+
+    assert pipe.commands == [("xadd", DEAD_STREAM, record(1))]
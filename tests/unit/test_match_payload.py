@@ -0,0 +1,48 @@
+"""Tests for match.find entry encoding."""
+
+import pytest
+
+from core.match_payload import PACKED_FIELD, decode_match_request, encode_match_request, payload_user_id
+
+
+def test_decodes_v1_entry() -> None:
+    request = decode_match_request({"user_id": "7", "tg_id": "1007", "topics": "anxiety,sleep", "timezone": "UTC"})
+
+    assert request.user_id == 7
+    assert request.topics == ["anxiety", "sleep"]
+    assert request.timezone == "UTC"
+    assert request.topic_ids is None
+    assert request.requested_at is None
+
+
+def test_decodes_v2_entry() -> None:
+    entry = encode_match_request(7, 1007, [1, 4, 65], "Europe/Moscow", 1_700_000_000.25)
+
+    request = decode_match_request(entry)
+
+    assert request.user_id == 7
+    assert request.topics == []
+    assert request.topic_ids == {1, 4, 65}
+    assert request.timezone == "Europe/Moscow"
+    assert request.requested_at == 1_700_000_000.25
+
+
+def test_v2_timezone_may_contain_colons() -> None:
+    entry = encode_match_request(7, 1007, [1, 2], "UTC+03:00", 1_700_000_000.0)
+
+    assert decode_match_request(entry).timezone == "UTC+03:00"
+
+
+def test_rejects_unknown_version() -> None:
+    entry = {PACKED_FIELD: "3:7:1007:6:1700000000000:UTC"}
+
+    with pytest.raises(ValueError, match="version 3"):
+        decode_match_request(entry)
+    assert payload_user_id(entry) is None
+
+
+def test_rejects_malformed_entries() -> None:
+    with pytest.raises(ValueError):
+        decode_match_request({PACKED_FIELD: "2:7:1007"})
+    with pytest.raises(KeyError):
+        decode_match_request({"user_id": "7"})
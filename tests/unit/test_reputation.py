@@ -0,0 +1,29 @@
+"""Tests for the helpfulness score formula."""
+
+import pytest
+
+from core.reputation import NEUTRAL_SCORE, compute_score
+
+
+def test_new_user_is_neutral() -> None:
+    assert compute_score(0, 0, 0, 0) == NEUTRAL_SCORE
+
+
+def test_ratings_are_pulled_towards_the_prior() -> None:
+    # Five 5-star ratings: (5 * 3 + 25) / 10 = 4.0 -> 0.75
+    assert compute_score(25, 5, 0, 0) == pytest.approx(0.75)
+    assert compute_score(5, 1, 0, 0) < compute_score(50, 10, 0, 0)
+
+
+def test_tip_bonus_is_capped() -> None:
+    assert compute_score(25, 5, 3, 0) == pytest.approx(0.81)
+    assert compute_score(25, 5, 50, 0) == pytest.approx(0.85)
+
+
+def test_reports_subtract_penalty() -> None:
+    assert compute_score(0, 0, 0, 2) == pytest.approx(0.3)
+
+
+def test_score_is_clamped() -> None:
+    assert compute_score(0, 0, 0, 20) == 0.0
+    assert compute_score(5000, 1000, 10, 0) == 1.0
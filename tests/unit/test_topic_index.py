@@ -0,0 +1,84 @@
+"""Tests for the in-memory topic index."""
+
+import numpy as np
+import pytest
+
+from apps.workers.topic_index import MAX_TOPICS, TopicIndex
+
+
+@pytest.fixture
+def index() -> TopicIndex:
+    index = TopicIndex()
+    index.set_user(1, {10: 1, 11: 1, 12: 1}, "Etc/UTC")
+    index.set_user(2, {10: 2, 11: 3}, "Etc/UTC")
+    index.set_user(3, {10: 1, 13: 1}, "Etc/UTC")
+    index.set_user(4, {10: 5, 11: 1, 12: 4}, "Etc/UTC")
+    return index
+
+
+def test_candidates_respect_min_shared(index: TopicIndex) -> None:
+    ids, rows = index.candidates(1, {10, 11, 12}, min_shared=2)
+
+    assert sorted(ids.tolist()) == [2, 4]
+    assert index.ids[rows].tolist() == ids.tolist()
+
+    ids, _ = index.candidates(1, {10, 11, 12}, min_shared=3)
+    assert ids.tolist() == [4]
+
+    ids, _ = index.candidates(1, {10, 11, 12}, min_shared=1)
+    assert sorted(ids.tolist()) == [2, 3, 4]
+
+
+def test_candidates_exclude_the_requester(index: TopicIndex) -> None:
+    ids, _ = index.candidates(4, {10, 11, 12}, min_shared=1)
+
+    assert 4 not in ids.tolist()
+
+
+def test_weighted_overlap_sums_candidate_weights_over_shared_topics(index: TopicIndex) -> None:
+    _, rows = index.candidates(1, {10, 11}, min_shared=2)
+    overlap = dict(zip(index.ids[rows].tolist(), index.weighted_overlap({10, 11}, rows).tolist(), strict=True))
+
+    assert overlap == {2: 5.0, 4: 6.0}
+
+
+def test_removed_user_frees_and_reuses_row(index: TopicIndex) -> None:
+    row = index.rows[2]
+    index.set_user(2, {})
+
+    assert 2 not in index.rows
+    assert index.topics_of(2) == set()
+    assert index.masks[row] == 0 and index.ids[row] == 0
+    assert 2 not in index.candidates(1, {10, 11, 12}, min_shared=1)[0].tolist()
+
+    index.set_user(5, {10: 1, 11: 1})
+
+    assert index.rows[5] == row
+    assert index.candidates(1, {10, 11, 12}, min_shared=2)[0].tolist().count(5) == 1
+
+
+def test_index_grows_past_initial_capacity() -> None:
+    index = TopicIndex()
+    for user_id in range(1, 101):
+        index.set_user(user_id, {1: 1, 2: 1})
+
+    ids, _ = index.candidates(0, {1, 2})
+    assert sorted(ids.tolist()) == list(range(1, 101))
+
+
+def test_more_than_64_topics_raise() -> None:
+    index = TopicIndex()
+    index.set_user(1, dict.fromkeys(range(MAX_TOPICS), 1))
+
+    with pytest.raises(ValueError, match="at most 64 topics"):
+        index.set_user(2, {MAX_TOPICS: 1})
+
+
+def test_pairwise_overlap_is_consistent_with_candidates(index: TopicIndex) -> None:
+    rows = np.array([index.rows[1], index.rows[2], index.rows[4]])
+    shared, weighted = index.pairwise_overlap(rows)
+
+    assert shared.tolist() == [[3, 2, 3], [2, 2, 2], [3, 2, 3]]
+    # weighted[i, j] sums row j's weights over row i's topics
+    assert weighted[1, 2] == pytest.approx(6.0)
+    assert weighted[2, 1] == pytest.approx(5.0)
@@ -0,0 +1,56 @@
+"""Tests for the precomputed timezone compatibility table."""
+
+import pytest
+
+from apps.workers.tz_table import ACTIVE_HOURS, UNKNOWN_TIME_SCORE, TimezoneTable
+
+# Fixed-offset zones (no DST); note the inverted sign of Etc/GMT names
+UTC = "Etc/UTC"
+UTC_PLUS_2 = "Etc/GMT-2"
+UTC_PLUS_5 = "Etc/GMT-5"
+UTC_PLUS_12 = "Etc/GMT-12"
+UTC_MINUS_11 = "Etc/GMT+11"
+
+
+@pytest.fixture
+def table() -> TimezoneTable:
+    return TimezoneTable()
+
+
+def test_codes_are_stable(table: TimezoneTable) -> None:
+    code = table.code_of(UTC)
+    assert table.code_of(UTC_PLUS_2) != code
+    assert table.code_of(UTC) == code
+
+
+def test_compatible_within_three_hours(table: TimezoneTable) -> None:
+    utc, plus_2, plus_5 = (table.code_of(tz) for tz in (UTC, UTC_PLUS_2, UTC_PLUS_5))
+
+    assert table.compatible[utc, plus_2]
+    assert table.compatible[plus_2, plus_5]
+    assert not table.compatible[utc, plus_5]
+    assert table.compatible[plus_5, utc] == table.compatible[utc, plus_5]
+
+
+def test_overlap_shrinks_with_offset_difference(table: TimezoneTable) -> None:
+    utc, plus_2 = table.code_of(UTC), table.code_of(UTC_PLUS_2)
+
+    assert table.overlap[utc, utc] == pytest.approx(1.0)
+    assert table.overlap[utc, plus_2] == pytest.approx((ACTIVE_HOURS - 2) / ACTIVE_HOURS)
+
+
+def test_offsets_wrap_around_the_date_line(table: TimezoneTable) -> None:
+    # UTC+12 and UTC-11 are 23h apart on paper but only 1h apart in practice
+    plus_12, minus_11 = table.code_of(UTC_PLUS_12), table.code_of(UTC_MINUS_11)
+
+    assert table.compatible[plus_12, minus_11]
+    assert table.overlap[plus_12, minus_11] == pytest.approx((ACTIVE_HOURS - 1) / ACTIVE_HOURS)
+
+
+@pytest.mark.parametrize("unknown", ["", "Mars/Olympus_Mons"])
+def test_unknown_zones_are_compatible_with_a_neutral_score(table: TimezoneTable, unknown: str) -> None:
+    utc, plus_12, other = table.code_of(UTC), table.code_of(UTC_PLUS_12), table.code_of(unknown)
+
+    assert table.compatible[other, utc] and table.compatible[plus_12, other]
+    assert table.overlap[other, utc] == UNKNOWN_TIME_SCORE
+    assert table.overlap[other, other] == UNKNOWN_TIME_SCORE